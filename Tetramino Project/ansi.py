@@ -0,0 +1,81 @@
+import re
+import sys
+from itertools import accumulate
+from typing import Dict, List
+
+_ESCAPE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+RESET = '\x1b[0m'
+CLEAR_SCREEN = '\x1b[H\x1b[2J'
+CLEAR_LINE_END = '\x1b[K'
+CLEAR_BELOW = '\x1b[J'
+
+
+class TerminalRenderer:
+    """Redraws a grid of cell strings in place, sending only the cells that changed since the last frame.
+
+    Each frame goes out as a single write. Cells may carry their own ANSI color codes;
+    a reset is appended to colored cells so a color never bleeds into its neighbours.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.previous: List[List[str]] = []
+        # Screen column where each cell of each row starts, for the rows as last drawn
+        self.columns: List[List[int]] = []
+        self._styled: Dict[str, str] = {}
+        self._widths: Dict[str, int] = {}
+        self._moves: Dict[tuple, str] = {}
+
+    def styled(self, cell: str) -> str:
+        text = self._styled.get(cell)
+        if text is None:
+            text = cell + RESET if '\x1b[' in cell and not cell.endswith(RESET) else cell
+            self._styled[cell] = text
+        return text
+
+    def width(self, cell: str) -> int:
+        width = self._widths.get(cell)
+        if width is None:
+            width = len(_ESCAPE.sub('', cell))
+            self._widths[cell] = width
+        return width
+
+    def move(self, row: int, column: int) -> str:
+        code = self._moves.get((row, column))
+        if code is None:
+            code = f'\x1b[{row + 1};{column + 1}H'
+            self._moves[(row, column)] = code
+        return code
+
+    def render(self, grid: List[List[str]]) -> None:
+        out = []
+        previous = self.previous
+        if len(previous) != len(grid):
+            out.append(CLEAR_SCREEN)
+            previous = [[] for _ in grid]
+            self.columns = [[] for _ in grid]
+        width = self.width
+        styled = self.styled
+        for i, row in enumerate(grid):
+            old = previous[i]
+            if old == row:
+                continue
+            if len(old) == len(row):
+                changed = [j for j, (before, after) in enumerate(zip(old, row)) if before != after]
+                if all(width(old[j]) == width(row[j]) for j in changed):
+                    columns = self.columns[i]
+                    for j in changed:
+                        out.append(self.move(i, columns[j]))
+                        out.append(styled(row[j]))
+                    continue
+            # The row's layout changed, so redraw all of it
+            out.append(self.move(i, 0))
+            out.extend(styled(cell) for cell in row)
+            out.append(CLEAR_LINE_END)
+            self.columns[i] = list(accumulate((width(cell) for cell in row), initial=0))
+        # Park the cursor under the grid so prompts printed after a frame land below it
+        out.append(self.move(len(grid), 0))
+        out.append(CLEAR_BELOW)
+        self.stream.write(''.join(out))
+        self.stream.flush()
+        self.previous = [list(row) for row in grid]
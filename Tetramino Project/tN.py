@@ -1,5 +1,7 @@
-import os
 from getkey import getkey
+from ansi import TerminalRenderer
+
+renderer = TerminalRenderer()
 
 def create_grid(w, h):
     grid = [[' ' * 2] * (3 * w + 2) for _ in range(3 * h + 2)]
@@ -46,7 +48,11 @@ def place_tetraminos(tetraminos, grid):
 
 def rotate_tetramino(tetramino, clockwise=True):
     rotation_matrix = lambda x, y: (y, -x) if clockwise else (-y, x)
-    tetramino[0] = [rotation_matrix(x, y) for x, y in tetramino[0]]
+    rotated = [rotation_matrix(x, y) for x, y in tetramino[0]]
+    # Keep the top-left corner of the piece in place instead of rotating around the origin
+    dx = min(x for x, _ in tetramino[0]) - min(x for x, _ in rotated)
+    dy = min(y for _, y in tetramino[0]) - min(y for _, y in rotated)
+    tetramino[0] = [(x + dx, y + dy) for x, y in rotated]
     return tetramino
 
 def check_move(tetramino, grid):
@@ -64,14 +70,9 @@ def check_win(grid):
     return True
 
 def print_grid(grid, no_number):
-    os.system('clear' if os.name == 'posix' else 'cls')
-    for i, row in enumerate(grid):
-        for j, cell in enumerate(row):
-            if no_number and cell[0].isdigit():
-                print(' ' * 2, end='')
-            else:
-                print(cell, end='')
-        print()
+    if no_number:
+        grid = [[' ' * 2 if cell[0].isdigit() else cell for cell in row] for row in grid]
+    renderer.render(grid)
 
 def main():
     dimensions, tetraminos = import_card('map_1.txt')
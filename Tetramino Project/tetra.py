@@ -1,6 +1,8 @@
-import os
 import sys
 from getkey import getkey
+from ansi import TerminalRenderer
+
+renderer = TerminalRenderer()
 
 def create_grid(w, h):
     # Create a grid of size (3w+2) × (3h +2)
@@ -49,9 +51,13 @@ def place_tetraminos(tetraminos, grid):
 
 def rotate_tetramino(tetramino, clockwise=True):
     if clockwise:
-        tetramino[0] = [(y, -x) for x, y in tetramino[0]]
+        rotated = [(y, -x) for x, y in tetramino[0]]
     else:
-        tetramino[0] = [(-y, x) for x, y in tetramino[0]]
+        rotated = [(-y, x) for x, y in tetramino[0]]
+    # Keep the top-left corner of the piece in place instead of rotating around the origin
+    dx = min(x for x, _ in tetramino[0]) - min(x for x, _ in rotated)
+    dy = min(y for _, y in tetramino[0]) - min(y for _, y in rotated)
+    tetramino[0] = [(x + dx, y + dy) for x, y in rotated]
 
     return tetramino
 
@@ -71,10 +77,7 @@ def check_win(grid):
     return True
 
 def print_grid(grid, no_number=False):
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-    for row in grid:
-        print(''.join(row))
+    renderer.render(grid)
 
 def main():
     if len(sys.argv) != 2:
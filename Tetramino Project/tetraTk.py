@@ -1,6 +1,4 @@
-import tkinter as tk
 import random
-import keyboard
 
 class Tetris:
     def __init__(self, master, width=10, height=20, block_size=30):
@@ -9,6 +7,8 @@ class Tetris:
         self.height = height
         self.block_size = block_size
         self.canvas_size = block_size
+        # tkinter is only needed once a window is built
+        import tkinter as tk
         self.canvas = tk.Canvas(master, width=width * block_size, height=height * block_size, bg="white")
         self.canvas.pack()
         self.shapes = [
@@ -24,7 +24,8 @@ class Tetris:
         self.new_shape()
         self.master.after(500, self.update)
 
-        # Updated key bindings
+        # Arrow keys go through keyboard's global hooks, which need root
+        import keyboard
         keyboard.on_press_key("left", self.move_left)
         keyboard.on_press_key("right", self.move_right)
         keyboard.on_press_key("up", self.rotate)
@@ -100,6 +101,7 @@ class Tetris:
         self.master.after(500, self.update)
 
 if __name__ == "__main__":
+    import tkinter as tk
     root = tk.Tk()
     root.title("Tetris")
     game = Tetris(root)
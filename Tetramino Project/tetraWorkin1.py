@@ -1,11 +1,15 @@
 import os
+import queue
 import sys
-from typing import List, Tuple
-import keyboard
+from typing import List, Optional, Tuple
+from ansi import TerminalRenderer
 
 # Define the Tetramino type
 Tetramino = Tuple[List[Tuple[int, int, int]], Tuple[int, int, int]]
 
+# Remembers the last frame print_grid drew, to diff the next one against
+renderer = TerminalRenderer()
+
 
 def create_grid(w: int, h: int) -> List[List[str]]:
     """Creates a grid of size (3w + 2) × (3h + 2), including the boundaries of the central area."""
@@ -90,8 +94,31 @@ def check_move(tetraminos, grid):
     return True
 
 
-def check_win(grid: List[List[str]]) -> bool:
-    """Checks if the current position of the pieces corresponds to a winning configuration."""
+def count_empty(grid: List[List[str]]) -> int:
+    """Counts the empty cells inside the border."""
+    return sum(cell == ' ' * 2 for row in grid[1:-1] for cell in row[1:-1])
+
+
+def covered_cells(blank: List[List[str]], tetraminos: List[Tetramino]) -> int:
+    """Counts the distinct cells, empty in the blank grid, that update_grid paints the pieces on."""
+    cells = set()
+    for blocks, offset in tetraminos:
+        for block in blocks:
+            # Same indexing as update_grid, negative indexes wrapping around included
+            row = (block[1] + offset[0] * 3) % len(blank)
+            column = (block[0] + offset[1] * 3) % len(blank[0])
+            if 0 < row < len(blank) - 1 and 0 < column < len(blank[0]) - 1 and blank[row][column] == ' ' * 2:
+                cells.add((row, column))
+    return len(cells)
+
+
+def check_win(grid: List[List[str]], empty: Optional[int] = None) -> bool:
+    """Checks if the current position of the pieces corresponds to a winning configuration.
+
+    Pass the live empty-cell count to skip scanning the grid.
+    """
+    if empty is not None:
+        return empty == 0
     for row in grid[1:-1]:
         for cell in row[1:-1]:
             if cell == ' ' * 2:
@@ -100,9 +127,8 @@ def check_win(grid: List[List[str]]) -> bool:
 
 
 def print_grid(grid: List[List[str]], no_number: bool = False):
-    """Prints the game board."""
-    for row in grid:
-        print(''.join(row[1:-1]))  # Omit borders for better display
+    """Prints the game board, redrawing only the cells that changed since the last call."""
+    renderer.render([row[1:-1] for row in grid])  # Omit borders for better display
 
 
 def rotate_or_move_tetramino(tetramino: Tetramino, move: str) -> Tetramino:
@@ -133,9 +159,8 @@ def update_grid(grid, tetraminos):
     return grid
 
 
-def on_key_event(e):
-    """Callback function for keyboard events."""
-    key = e.name
+def on_key_event(key, grid, tetraminos):
+    """Applies one key press and returns the redrawn grid."""
     if key in ["left", "right", "up", "down"]:
         # Update tetraminos based on the pressed key
         for idx, tetramino in enumerate(tetraminos):
@@ -152,6 +177,8 @@ def on_key_event(e):
 
         # Print the updated grid
         print_grid(updated_grid)
+        return updated_grid
+    return grid
 
 
 def main():
@@ -173,8 +200,18 @@ def main():
     # Print the initial grid
     print_grid(grid)
 
-    # Register the callback function for keyboard events
-    keyboard.hook(on_key_event)
+    # Every key press repaints the pieces on a blank grid, so the empty cells left are the
+    # blank grid's empty cells minus those the pieces cover; this avoids rescanning the grid
+    blank = create_grid(*dimensions)
+    blank_cells = count_empty(blank)
+    empty_cells = count_empty(grid)
+
+    # Imported here so bench.py can load this module without root, which keyboard's hook needs
+    import keyboard
+
+    # The keyboard listener thread only queues key names; the grid is changed on this thread alone
+    events = queue.Queue()
+    keyboard.hook(lambda e: events.put(e.name) if e.event_type == keyboard.KEY_DOWN else None)
 
     # Use a flag to control the game loop
     game_running = True
@@ -182,11 +219,22 @@ def main():
     # Main game loop
     while game_running:
         # Example condition to end the game (you can modify this based on your game logic)
-        if check_win(grid) or not check_move(tetraminos, grid):
+        if check_win(grid, empty_cells) or not check_move(tetraminos, grid):
             game_running = False
+            break
+
+        # Block until the next key press, so the game uses no CPU while idle;
+        # the end conditions are only re-checked after the grid has changed
+        key = events.get()
+        while key not in ["left", "right", "up", "down"]:
+            key = events.get()
+        grid = on_key_event(key, grid, tetraminos)
+        empty_cells = blank_cells - covered_cells(blank, tetraminos)
+
+    keyboard.unhook_all()
 
     print("Game Over!")
-    if check_win(grid):
+    if check_win(grid, empty_cells):
         print("Congratulations! You've won!")
     else:
         print("You've reached an unwinnable state. Better luck next time.")
@@ -1,7 +1,6 @@
 import os
 import sys
 from typing import List, Tuple
-import keyboard
 
 # Define the Tetramino type
 Tetramino = Tuple[List[Tuple[int, int, int]], Tuple[int, int, int]]
@@ -123,6 +122,9 @@ def main():
     # Setup initial tetraminos
     grid, tetraminos = setup_tetraminos(tetraminos, grid)
 
+    # Polled with is_pressed below; reading the keyboard that way needs root
+    import keyboard
+
     # Initial tetramino index
     tetramino_index = 0
     current_tetramino = tetraminos[tetramino_index]
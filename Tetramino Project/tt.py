@@ -1,7 +1,7 @@
 import os
+import queue
 import sys
 from typing import List, Tuple
-import keyboard 
 
 # Define the Tetramino type
 Tetramino = Tuple[List[Tuple[int, int]], Tuple[int, int, int]]
@@ -117,9 +117,8 @@ def rotate_or_move_tetramino(tetramino: Tuple[List[Tuple[int, int, int]], Tuple[
         # No valid move or rotate command
         return tetramino
 
-def on_key_event(e):
-    """Callback function for keyboard events."""
-    key = e.name
+def on_key_event(key, grid, tetraminos):
+    """Applies one key press to the tetraminos and the grid."""
     if key in ["left", "right", "up", "down"]:
         # Update grid and tetraminos based on the pressed key
         for idx, tetramino in enumerate(tetraminos):
@@ -152,14 +151,22 @@ def main():
     # Set up tetraminos on the grid
     grid, tetraminos = setup_tetraminos(tetraminos, grid)
 
-    # Attach the on_key_event function to the keyboard listener
-    keyboard.hook(on_key_event)
+    # The global key hook below needs root, so the import waits until play starts
+    import keyboard
+
+    # The keyboard listener thread only queues key names; the grid is changed on this thread alone
+    events = queue.Queue()
+    keyboard.hook(lambda e: events.put(e.name) if e.event_type == keyboard.KEY_DOWN else None)
 
     # Use a flag to control the game loop
     game_running = True
+    key = None
 
     # Main game loop
     while game_running:
+        if key is not None:
+            on_key_event(key, grid, tetraminos)
+
         # Print debug information
         print("Grid:")
         print_grid(grid)
@@ -174,7 +181,14 @@ def main():
         # Example condition to end the game (you can modify this based on your game logic)
         if check_win(grid) or not check_move(tetraminos, grid):
             game_running = False
+            break
+
+        # Block until the next key press, so the game uses no CPU while idle
+        key = events.get()
+        while key not in ["left", "right", "up", "down"]:
+            key = events.get()
 
+    keyboard.unhook_all()
     print("Game Over!")
     if check_win(grid):
         print("Congratulations! You've won!")
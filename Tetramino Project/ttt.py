@@ -1,4 +1,3 @@
-import tkinter as tk
 import random
 import time
 
@@ -9,8 +8,13 @@ class Tetris:
         self.width = width
         self.height = height
         self.canvas_size = 30
+        # Deferred so the board logic can run headless
+        import tkinter as tk
         self.canvas = tk.Canvas(self.master, width=width * self.canvas_size, height=height * self.canvas_size)
         self.canvas.pack()
+        # Locked blocks of each row as a bitmask (bit x set when column x is filled), updated when a shape is merged
+        self.rows = [0] * height
+        self.full_row = (1 << width) - 1
         self.shapes = [
             [[1, 1, 1, 1]],
             [[1, 1, 1], [1]],
@@ -29,7 +33,7 @@ class Tetris:
         return {"shape": shape, "color": color, "x": self.width // 2 - len(shape[0]) // 2, "y": 0}
 
     def draw(self):
-        self.canvas.delete("all")
+        self.canvas.delete("current_shape")
         for i in range(self.width):
             for j in range(self.height):
                 if self.current_shape["y"] <= j < self.current_shape["y"] + len(self.current_shape["shape"]):
@@ -41,7 +45,7 @@ class Tetris:
                             self.canvas.create_rectangle(
                                 x * self.canvas_size, y * self.canvas_size,
                                 (x + 1) * self.canvas_size, (y + 1) * self.canvas_size,
-                                fill=self.current_shape["color"], outline="black"
+                                fill=self.current_shape["color"], outline="black", tags="current_shape"
                             )
 
     def move_shape(self, dx, dy):
@@ -75,27 +79,22 @@ class Tetris:
                     self.canvas.create_rectangle(
                         x * self.canvas_size, y * self.canvas_size,
                         (x + 1) * self.canvas_size, (y + 1) * self.canvas_size,
-                        fill=self.current_shape["color"], outline="black"
+                        fill=self.current_shape["color"], outline="black", tags="locked"
                     )
+                    if 0 <= y < self.height:
+                        self.rows[y] |= 1 << x
 
     def is_valid_position(self, x, y, shape):
-    for i in range(len(shape)):
-        for j in range(len(shape[i])):
-            if shape[i][j]:
-                if (
-                    x + j < 0 or x + j >= self.width or
-                    y + i >= self.height or
-                    (y + i >= 0 and self.get_fill_color(x, y) != "")
-                ):
-                    return False
-    return True
-
-def get_fill_color(self, x, y):
-    enclosed = self.canvas.find_enclosed(x * self.canvas_size, y * self.canvas_size, (x + 1) * self.canvas_size, (y + 1) * self.canvas_size)
-    if enclosed:
-        return self.canvas.itemcget(enclosed[0], "fill")
-    return ""
-
+        for i in range(len(shape)):
+            for j in range(len(shape[i])):
+                if shape[i][j]:
+                    if (
+                        x + j < 0 or x + j >= self.width or
+                        y + i >= self.height or
+                        (y + i >= 0 and self.rows[y + i] >> (x + j) & 1)
+                    ):
+                        return False
+        return True
 
     def rotate_shape(self):
         rotated_shape = list(zip(*reversed(self.current_shape["shape"])))
@@ -104,18 +103,31 @@ def get_fill_color(self, x, y):
             self.draw()
 
     def clear_lines(self):
-        for i in range(self.height - 1, -1, -1):
-            if all(self.canvas.itemcget(self.canvas.find_enclosed(0, i * self.canvas_size, self.width * self.canvas_size, (i + 1) * self.canvas_size)[0], "fill") != "" for _ in range(self.width)):
-                self.canvas.delete(self.canvas.find_enclosed(0, i * self.canvas_size, self.width * self.canvas_size, (i + 1) * self.canvas_size)[0])
-                for j in range(i, 0, -1):
-                    for k in range(self.width):
-                        fill_color = self.canvas.itemcget(self.canvas.find_enclosed(k * self.canvas_size, j * self.canvas_size, (k + 1) * self.canvas_size, (j + 1) * self.canvas_size)[0], "fill")
-                        self.canvas.create_rectangle(
-                            k * self.canvas_size, (j + 1) * self.canvas_size,
-                            (k + 1) * self.canvas_size, (j + 2) * self.canvas_size,
-                            fill=fill_color, outline="black"
-                        )
+        # Only the rows the merged shape touched can have become full
+        rows = range(self.current_shape["y"], self.current_shape["y"] + len(self.current_shape["shape"]))
+        lines_to_clear = [i for i in rows if 0 <= i < self.height and self.rows[i] == self.full_row]
+        if not lines_to_clear:
+            return
+        for line in reversed(lines_to_clear):
+            del self.rows[line]
+        self.rows[0:0] = [0] * len(lines_to_clear)
+
+        half = self.canvas_size // 2
+        right = self.width * self.canvas_size + half
+        for line in lines_to_clear:
+            self.canvas.addtag_enclosed("cleared", -half, line * self.canvas_size - half, right, (line + 1) * self.canvas_size + half)
+        self.canvas.delete("cleared")
+        # Shift each band of rows between cleared lines down in one move, bottom band first
+        bounds = [-1] + lines_to_clear
+        for k in range(len(lines_to_clear), 0, -1):
+            top, bottom = bounds[k - 1] + 1, bounds[k]
+            if top < bottom:
+                self.canvas.addtag_enclosed("falling", -half, top * self.canvas_size - half, right, bottom * self.canvas_size + half)
+                self.canvas.move("falling", 0, (len(lines_to_clear) - k + 1) * self.canvas_size)
+                self.canvas.dtag("falling")
+
 if __name__ == "__main__":
+    import tkinter as tk
     root = tk.Tk()
     tetris = Tetris(root)
     
@@ -131,10 +143,14 @@ if __name__ == "__main__":
 
     root.bind("<Key>", key)
 
-    while not tetris.game_over:
-        root.update_idletasks()
-        root.update()
+    # Gravity runs from Tk's event loop so key presses are handled between ticks
+    # instead of waiting out a sleep; each tick is scheduled against a fixed deadline
+    def gravity(deadline):
+        if tetris.game_over:
+            return
         tetris.move_shape(0, 1)
-        time.sleep(0.5)
+        deadline += 0.5
+        root.after(max(0, int((deadline - time.perf_counter()) * 1000)), gravity, deadline)
 
+    root.after(500, gravity, time.perf_counter() + 0.5)
     root.mainloop()
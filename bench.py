@@ -0,0 +1,382 @@
+"""Benchmarks for the game and puzzle hot paths.
+
+    python bench.py                      # run everything, write bench_results.json
+    python bench.py --save-baseline      # also store the results as the new baseline
+    python bench.py -k clear_lines       # only benchmarks whose name contains the pattern
+
+Results are compared against the baseline (bench_baseline.json by default);
+any benchmark whose ops/sec drops by more than --tolerance, or whose p95
+latency grows by more than --latency-tolerance, is reported and the exit
+status is 1. Benchmarks that need Tk are skipped without a display.
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.join(HERE, "Tetramino Project")
+
+BOARD_SIZES = [(10, 20), (20, 40), (40, 80)]
+CARD_SIZES = [(5, 4), (10, 10), (20, 20)]
+
+# name -> (sizes, factory); a factory takes (size, rng) and returns (setup or None, op)
+BENCHMARKS: Dict[str, Tuple[List[Tuple[int, int]], Callable]] = {}
+
+
+class Skip(Exception):
+    """Raised by a benchmark factory when its dependencies are unavailable."""
+
+
+def benchmark(name: str, sizes: List[Tuple[int, int]]):
+    def register(factory):
+        BENCHMARKS[name] = (sizes, factory)
+        return factory
+    return register
+
+
+_tk_root = None
+# Scratch directory for the cards the puzzle benchmarks write, created and removed by run()
+_work_dir = None
+
+
+def tk_root():
+    """Returns a shared, withdrawn Tk root, or raises Skip when there is no display."""
+    global _tk_root
+    if _tk_root is None:
+        try:
+            import tkinter as tk
+            _tk_root = tk.Tk()
+            _tk_root.withdraw()
+        except Exception as error:
+            raise Skip(f"Tk unavailable: {error}")
+    return _tk_root
+
+
+def load_project_module(name: str):
+    """Imports a script from 'Tetramino Project' by path; its directory name is not a valid package."""
+    if PROJECT_DIR not in sys.path:
+        # The scripts import their sibling modules, such as ansi.py
+        sys.path.append(PROJECT_DIR)
+    spec = importlib.util.spec_from_file_location(f"project_{name}", os.path.join(PROJECT_DIR, name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as error:
+        raise Skip(f"{name}.py: {error}")
+    return module
+
+
+def write_card(size: Tuple[int, int], rng: random.Random, directory: str) -> str:
+    """Writes a solvable w×h card, cut into horizontal bars of 1-4 cells, in the map_1.txt dialect."""
+    w, h = size
+    lines = [f"{w}, {h}\n"]
+    for y in range(h):
+        x = 0
+        while x < w:
+            length = min(rng.randint(1, 4), w - x)
+            cells = "; ".join(f"{i}, 0" for i in range(length))
+            lines.append(f"{cells};;0, 37, {41 + rng.randrange(6)}\n")
+            x += length
+    path = os.path.join(directory, f"card_{w}x{h}.txt")
+    with open(path, "w") as file:
+        file.writelines(lines)
+    return path
+
+
+def random_stack(board, rng: random.Random, fill: float = 0.5) -> None:
+    """Fills the lower half of a board with random, never complete, rows."""
+    for y in range(board.height // 2, board.height):
+        row = 0
+        for x in range(board.width):
+            if rng.random() < fill:
+                row |= 1 << x
+        board.rows[y] = row & ~(1 << rng.randrange(board.width))
+    board.rehash()
+
+
+def tetris_game(size: Tuple[int, int]):
+    import tetramino
+    root = tk_root()
+    # The gravity timer never fires: nothing runs the Tk event loop while benchmarking
+    return tetramino.Tetris(root, width=size[0], height=size[1])
+
+
+@benchmark("tetramino.is_valid_position", BOARD_SIZES)
+def bench_is_valid_position(size, rng):
+    game = tetris_game(size)
+    random_stack(game.board, rng)
+    orientation = game.current_shape["orientation"]
+    positions = [(rng.randrange(-1, size[0]), rng.randrange(size[1])) for _ in range(256)]
+    index = [0]
+
+    def op():
+        x, y = positions[index[0] & 255]
+        index[0] += 1
+        game.is_valid_position(x, y, orientation)
+    return None, op
+
+
+@benchmark("tetramino.clear_lines", BOARD_SIZES)
+def bench_clear_lines(size, rng):
+    game = tetris_game(size)
+    w, h = size
+    cs = game.canvas_size
+
+    def setup():
+        game.canvas.delete("locked")
+        random_stack(game.board, rng)
+        for y in range(h - 4, h):
+            game.board.rows[y] = game.board.full_row
+        game.board.rehash()
+        for y in range(h // 2, h):
+            for x in range(w):
+                if game.board.is_filled(x, y):
+                    game.canvas.create_rectangle(x * cs, y * cs, (x + 1) * cs, (y + 1) * cs, fill="red", tags="locked")
+        game.current_y = h - 4
+
+    return setup, game.clear_lines
+
+
+@benchmark("tetramino.draw_shape", BOARD_SIZES)
+def bench_draw_shape(size, rng):
+    game = tetris_game(size)
+    xs = [rng.randrange(size[0] - 3) for _ in range(256)]
+    index = [0]
+
+    def op():
+        game.current_x = xs[index[0] & 255]
+        index[0] += 1
+        game.draw_shape()
+    return None, op
+
+
+def puzzle_state(size, rng):
+    import t
+    path = write_card(size, rng, _work_dir)
+    dimensions, tetraminos = t.import_card(path)
+    grid = t.create_grid(*dimensions)
+    return t, path, grid, tetraminos
+
+
+@benchmark("t.import_card", CARD_SIZES)
+def bench_import_card(size, rng):
+    import cards
+    t, path, _, _ = puzzle_state(size, rng)
+    return None, lambda: cards.load_card(path, cache=False)
+
+
+@benchmark("t.import_card[cached]", CARD_SIZES)
+def bench_import_card_cached(size, rng):
+    t, path, _, _ = puzzle_state(size, rng)
+    t.import_card(path)
+    return None, lambda: t.import_card(path)
+
+
+@benchmark("t.check_move", CARD_SIZES)
+def bench_check_move(size, rng):
+    t, _, grid, tetraminos = puzzle_state(size, rng)
+    pieces = [([(x + rng.randrange(len(grid[0]) - 4), y + rng.randrange(len(grid) - 1)) for x, y in piece[0]], piece[1])
+              for piece in rng.sample(tetraminos, min(64, len(tetraminos)))]
+    index = [0]
+
+    def op():
+        t.check_move(pieces[index[0] % len(pieces)], grid)
+        index[0] += 1
+    return None, op
+
+
+@benchmark("t.check_win", CARD_SIZES)
+def bench_check_win(size, rng):
+    t, _, grid, _ = puzzle_state(size, rng)
+    # Worst case: only the last cell of the target area is empty
+    w, h = size
+    for row in grid[:h]:
+        row[:w] = ["#"] * w
+    grid[h - 1][w - 1] = " "
+    return None, lambda: t.check_win(grid, size)
+
+
+@benchmark("t.update_display", CARD_SIZES)
+def bench_update_display(size, rng):
+    t, _, grid, tetraminos = puzzle_state(size, rng)
+    t.root = tk_root()
+    # t.main() normally imports tkinter into t; the benchmark skips main()
+    import tkinter
+    t.tk = tkinter
+    t.update_display(grid)
+    piece = tetraminos[0]
+    state = {"x": 0}
+
+    def op():
+        old = [(x + state["x"], y) for x, y in piece[0]]
+        state["x"] = (state["x"] + 1) % (len(grid[0]) - 4)
+        new = [(x + state["x"], y) for x, y in piece[0]]
+        t.remove_tetraminos(grid, (old, piece[1]))
+        t.place_tetraminos(grid, (new, piece[1]))
+        t.update_display(grid, set(old) | set(new))
+    return None, op
+
+
+def workin_state(size, rng):
+    module = load_project_module("tetraWorkin1")
+    grid = module.create_grid(*size)
+    # tetraWorkin1 reads the second element as both the block offset and the ANSI color
+    tetraminos = [([(rng.randrange(3), rng.randrange(3), 0) for _ in range(4)], (rng.randrange(size[1]), rng.randrange(size[0])))
+                  for _ in range(size[0])]
+    return module, grid, tetraminos
+
+
+@benchmark("tetraWorkin1.update_grid", CARD_SIZES)
+def bench_update_grid(size, rng):
+    module, grid, tetraminos = workin_state(size, rng)
+    return None, lambda: module.update_grid(grid, tetraminos)
+
+
+@benchmark("tetraWorkin1.print_grid", CARD_SIZES)
+def bench_print_grid(size, rng):
+    module, grid, tetraminos = workin_state(size, rng)
+    sink = io.StringIO()
+    module.renderer.stream = sink
+    # Alternate between two frames so the renderer always has a moved piece to redraw
+    frames = [module.update_grid(grid, tetraminos),
+              module.update_grid(grid, [module.move_tetramino(tetramino, "right") for tetramino in tetraminos])]
+    index = [0]
+
+    def op():
+        module.print_grid(frames[index[0] & 1])
+        index[0] += 1
+        sink.seek(0)
+        sink.truncate()
+    return None, op
+
+
+def measure(setup: Optional[Callable], op: Callable, min_time: float, samples: int) -> Dict[str, float]:
+    """Times op() in batches and reports throughput plus per-op latency percentiles."""
+    clock = time.perf_counter
+    batch = 1
+    if setup is None:
+        # Grow the batch until one batch takes about min_time / samples
+        while True:
+            start = clock()
+            for _ in range(batch):
+                op()
+            if clock() - start >= min_time / samples or batch >= 1 << 20:
+                break
+            batch *= 2
+    per_op = []
+    total = 0.0
+    ops = 0
+    deadline = clock() + min_time
+    while len(per_op) < samples or clock() < deadline:
+        if setup is not None:
+            setup()
+        start = clock()
+        for _ in range(batch):
+            op()
+        elapsed = clock() - start
+        per_op.append(elapsed / batch)
+        total += elapsed
+        ops += batch
+        if len(per_op) >= samples * 100:
+            break
+    per_op.sort()
+    return {
+        "ops_per_sec": ops / total if total else float("inf"),
+        "mean_us": total / ops * 1e6,
+        "p50_us": per_op[len(per_op) // 2] * 1e6,
+        "p95_us": per_op[min(len(per_op) - 1, int(len(per_op) * 0.95))] * 1e6,
+        "ops": ops,
+    }
+
+
+def run(pattern: str = "", min_time: float = 0.2, samples: int = 20, seed: int = 0) -> Dict[str, dict]:
+    global _work_dir
+    with tempfile.TemporaryDirectory(prefix="bench_") as _work_dir:
+        return _run(pattern, min_time, samples, seed)
+
+
+def _run(pattern: str, min_time: float, samples: int, seed: int) -> Dict[str, dict]:
+    results = {}
+    for name, (sizes, factory) in BENCHMARKS.items():
+        if pattern not in name:
+            continue
+        for size in sizes:
+            key = f"{name}[{size[0]}x{size[1]}]"
+            try:
+                setup, op = factory(size, random.Random(seed))
+            except Skip as reason:
+                print(f"{key:45} skipped ({reason})")
+                break
+            results[key] = measure(setup, op, min_time, samples)
+            stats = results[key]
+            print(f"{key:45} {stats['ops_per_sec']:>12.0f} ops/s  mean {stats['mean_us']:>9.2f} us  p95 {stats['p95_us']:>9.2f} us")
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float,
+            latency_tolerance: float = 0.5) -> List[str]:
+    """Returns one line per benchmark whose ops/sec dropped by more than `tolerance`, or whose p95
+    latency grew by more than `latency_tolerance`, against the baseline."""
+    regressions = []
+    for key, stats in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        ratio = stats["ops_per_sec"] / previous["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{key}: {previous['ops_per_sec']:.0f} -> {stats['ops_per_sec']:.0f} ops/s ({ratio:.0%})")
+        if previous.get("p95_us"):
+            growth = stats["p95_us"] / previous["p95_us"]
+            if growth > 1 + latency_tolerance:
+                regressions.append(f"{key}: p95 {previous['p95_us']:.2f} -> {stats['p95_us']:.2f} us ({growth:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game and puzzle hot paths.")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the results")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed ops/sec drop, as a fraction")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5,
+                        help="allowed p95 latency growth, as a fraction")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent per benchmark and size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    results = run(args.pattern, args.min_time, seed=args.seed)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=2)
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance,
+                                  args.latency_tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        status = 1 if regressions else 0
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+from typing import Iterable, List, Tuple
+
+import zobrist
+
+
+class Board:
+    """Tetris playfield stored as one integer bitmask per row (bit x = column x)."""
+
+    def __init__(self, width: int = 10, height: int = 20):
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        self.rows = [0] * height
+        # Zobrist hash of the filled cells, kept up to date by lock() and clear_rows()
+        self.keys = zobrist.cell_keys(width, height)[0]
+        self.hash = 0
+
+    def is_valid_position(self, masks: Tuple[int, ...], x: int, y: int) -> bool:
+        """Checks that the piece fits inside the walls and does not overlap locked cells."""
+        full_row = self.full_row
+        rows = self.rows
+        height = self.height
+        for i, mask in enumerate(masks):
+            if not mask:
+                continue
+            if x >= 0:
+                shifted = mask << x
+            elif mask & ((1 << -x) - 1):
+                return False
+            else:
+                shifted = mask >> -x
+            if shifted & ~full_row:
+                return False
+            row = y + i
+            if row >= height:
+                return False
+            if row >= 0 and rows[row] & shifted:
+                return False
+        return True
+
+    def lock(self, masks: Tuple[int, ...], x: int, y: int) -> List[int]:
+        """Merges the piece into the board and returns the rows it touched."""
+        touched = []
+        for i, mask in enumerate(masks):
+            row = y + i
+            if mask and 0 <= row < self.height:
+                shifted = mask << x if x >= 0 else mask >> -x
+                self.hash ^= zobrist.mask_hash(self.keys[row], shifted & ~self.rows[row] & self.full_row)
+                self.rows[row] |= shifted
+                touched.append(row)
+        if zobrist.DEBUG:
+            zobrist.verify("Board.lock", self.hash, self.full_hash())
+        return touched
+
+    def full_rows(self, rows: Iterable[int]) -> List[int]:
+        """Returns the given rows that are completely filled, top to bottom."""
+        return sorted(row for row in set(rows) if 0 <= row < self.height and self.rows[row] == self.full_row)
+
+    def clear_rows(self, lines: List[int]) -> None:
+        """Removes the given rows and drops everything above them."""
+        if not lines:
+            return
+        # Only rows down to the lowest cleared line move, so only they are rehashed
+        bottom = max(lines) + 1
+        self.hash ^= self.full_hash(bottom)
+        for row in sorted(lines, reverse=True):
+            del self.rows[row]
+        self.rows[0:0] = [0] * len(lines)
+        self.hash ^= self.full_hash(bottom)
+        if zobrist.DEBUG:
+            zobrist.verify("Board.clear_rows", self.hash, self.full_hash())
+
+    def full_hash(self, bottom: int = None) -> int:
+        """Recomputes the hash of rows 0..bottom-1 (all rows by default) from scratch."""
+        value = 0
+        for row in range(self.height if bottom is None else bottom):
+            if self.rows[row]:
+                value ^= zobrist.mask_hash(self.keys[row], self.rows[row] & self.full_row)
+        return value
+
+    def rehash(self) -> None:
+        """Resynchronizes the hash after `rows` was changed directly."""
+        self.hash = self.full_hash()
+
+    def is_filled(self, x: int, y: int) -> bool:
+        return bool(self.rows[y] >> x & 1)
@@ -0,0 +1,130 @@
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from board import Board
+from engine import DROP, TetrisEngine
+from shapes import Orientation
+
+# Feature weights: aggregate height, lines cleared, holes, bumpiness
+DEFAULT_WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+
+
+class Placement(NamedTuple):
+    rotation: int
+    x: int
+    y: int
+    score: float
+
+
+class _Candidates(NamedTuple):
+    """Every (rotation, column) drop of one orientation table, as flat arrays."""
+    rotations: np.ndarray  # (N,)
+    xs: np.ndarray         # (N,)
+    dx: np.ndarray         # (N, K) cell columns relative to x
+    dy: np.ndarray         # (N, K) cell rows relative to y
+
+
+class Bot:
+    """Greedy player that scores every drop of the current piece in one NumPy batch."""
+
+    def __init__(self, weights: Sequence[float] = DEFAULT_WEIGHTS):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self._candidates: Dict[Tuple[int, int, int], _Candidates] = {}
+
+    def candidates(self, orientations: Tuple[Orientation, ...], width: int) -> _Candidates:
+        key = (id(orientations), len(orientations), width)
+        found = self._candidates.get(key)
+        if found is None:
+            size = max(len(orientation.cells) for orientation in orientations)
+            rotations, xs, dx, dy = [], [], [], []
+            for rotation, orientation in enumerate(orientations):
+                # Pieces with fewer cells repeat their last cell, which does not change the result
+                cells = list(orientation.cells) + [orientation.cells[-1]] * (size - len(orientation.cells))
+                for x in range(width - orientation.width + 1):
+                    rotations.append(rotation)
+                    xs.append(x)
+                    dx.append([cx for cx, _ in cells])
+                    dy.append([cy for _, cy in cells])
+            found = _Candidates(np.array(rotations), np.array(xs), np.array(dx), np.array(dy))
+            self._candidates[key] = found
+        return found
+
+    def evaluate(self, board: Board, orientations: Tuple[Orientation, ...]) -> Tuple[_Candidates, np.ndarray, np.ndarray]:
+        """Returns the candidates, their landing rows, and their scores (-inf where the piece does not fit)."""
+        width, height = board.width, board.height
+        grid = (np.array(board.rows, dtype=np.int64)[:, None] >> np.arange(width)) & 1 != 0
+        # First filled row of each column, or the floor
+        top = np.where(grid.any(axis=0), grid.argmax(axis=0), height)
+
+        found = self.candidates(orientations, width)
+        columns = found.xs[:, None] + found.dx
+        ys = (top[columns] - 1 - found.dy).min(axis=1)
+        fits = ys >= 0
+        rows = np.clip(ys[:, None] + found.dy, 0, height - 1)
+
+        count = len(ys)
+        boards = np.broadcast_to(grid, (count, height, width)).copy()
+        boards[np.arange(count)[:, None], rows, columns] = True
+
+        full = boards.all(axis=2)
+        lines = full.sum(axis=1)
+        if lines.any():
+            # Move full rows to the top, keeping the order of the others, then empty them
+            order = np.argsort(~full, axis=1, kind="stable")
+            boards = np.take_along_axis(boards, order[:, :, None], axis=1)
+            boards[np.arange(height)[None, :] < lines[:, None]] = False
+
+        filled = boards.any(axis=1)
+        heights = np.where(filled, height - boards.argmax(axis=1), 0)
+        covered = np.logical_or.accumulate(boards, axis=1)
+        holes = (covered & ~boards).sum(axis=(1, 2))
+        bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+
+        features = np.stack([heights.sum(axis=1), lines, holes, bumpiness], axis=1)
+        scores = np.where(fits, features @ self.weights, -np.inf)
+        return found, ys, scores
+
+    def best_placement(self, board: Board, orientations: Tuple[Orientation, ...]) -> Optional[Placement]:
+        found, ys, scores = self.evaluate(board, orientations)
+        best = int(scores.argmax())
+        if scores[best] == -np.inf:
+            return None
+        return Placement(int(found.rotations[best]), int(found.xs[best]), int(ys[best]), float(scores[best]))
+
+    def play(self, game: TetrisEngine) -> int:
+        """Puts the engine's current piece at the best placement and drops it. Returns lines cleared."""
+        placement = self.best_placement(game.board, game.orientations)
+        masks = game.orientations[placement.rotation].masks if placement is not None else None
+        if placement is not None and game.board.is_valid_position(masks, placement.x, game.current_y):
+            game.rotation = placement.rotation
+            game.current_masks = masks
+            game.current_x = placement.x
+        return game.step(DROP)
+
+
+def play_game(seed: int, weights: Sequence[float] = DEFAULT_WEIGHTS, max_pieces: int = 500) -> TetrisEngine:
+    """Plays one headless game with the bot, stopping at game over or after `max_pieces` pieces."""
+    bot = Bot(weights)
+    game = TetrisEngine(seed=seed)
+    while not game.game_over and game.pieces <= max_pieces:
+        bot.play(game)
+    return game
+
+
+def main(argv: List[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    games = int(argv[0]) if argv else 20
+    start = time.perf_counter()
+    results = [play_game(seed) for seed in range(games)]
+    elapsed = time.perf_counter() - start
+    pieces = sum(game.pieces for game in results)
+    lines = [game.lines_cleared for game in results]
+    print(f"{games} games: mean {sum(lines) / games:.1f} lines, min {min(lines)}, max {max(lines)}; "
+          f"{pieces / elapsed:.0f} decisions/s ({elapsed / pieces * 1e6:.0f} us each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Generates puzzle cards that are solvable by construction.
+
+    python cardgen.py packs/5x4 --count 1000 --size 5x4 --pieces 3-5
+    python cardgen.py packs/big --count 100000 --size 8x8 --pieces 4-6 --workers 8
+
+A card is made by cutting the w×h rectangle into random connected pieces, then turning each
+piece to a random rotation and shuffling their order, so the cut itself is always a solution.
+Card n of a batch is generated from seed + n, so a pack is the same whatever the worker count.
+"""
+import argparse
+import os
+import random
+import time
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+
+from cards import Card, format_card
+from shapes import normalize, orientation_table
+
+# ANSI background colors used in the hand-written cards
+COLORS = [(0, 37, background) for background in range(41, 48)]
+
+
+def _grow(start: int, index: int, target: int, owner: List[int], neighbours: List[List[int]],
+          rng: random.Random, tightness: float) -> List[int]:
+    """Claims up to `target` connected free cells for piece `index`, starting from `start`."""
+    cells = [start]
+    owner[start] = index
+    frontier = [j for j in neighbours[start] if owner[j] < 0]
+    while len(cells) < target and frontier:
+        # Mostly take the free cell with the fewest free neighbours, which would otherwise
+        # be the first to end up cut off; the rest of the time any cell, for variety
+        if rng.random() < tightness:
+            free = [sum(owner[k] < 0 for k in neighbours[j]) for j in frontier]
+            fewest = min(free)
+            cell = rng.choice([j for j, count in zip(frontier, free) if count == fewest])
+        else:
+            cell = rng.choice(frontier)
+        owner[cell] = index
+        cells.append(cell)
+        frontier = [j for j in frontier if owner[j] < 0]
+        frontier.extend(j for j in neighbours[cell] if owner[j] < 0 and j not in frontier)
+    return cells
+
+
+def _cuts_off(cells: List[int], owner: List[int], neighbours: List[List[int]], min_size: int) -> bool:
+    """True when the piece leaves a pocket of free cells too small for any piece.
+
+    Each flood fill stops as soon as it has seen min_size cells, so the check costs
+    O(piece cells * min_size) rather than a pass over the card.
+    """
+    seen = set()
+    for i in cells:
+        for j in neighbours[i]:
+            if owner[j] >= 0 or j in seen:
+                continue
+            pocket = {j}
+            stack = [j]
+            while stack and len(pocket) < min_size:
+                for k in neighbours[stack.pop()]:
+                    if owner[k] < 0 and k not in pocket:
+                        pocket.add(k)
+                        stack.append(k)
+            if len(pocket) < min_size:
+                return True
+            seen |= pocket
+    return False
+
+
+def partition(w: int, h: int, min_size: int, max_size: int, rng: random.Random, attempts: int = 100,
+              retries: int = 8, tightness: float = 0.7) -> List[List[Tuple[int, int]]]:
+    """Cuts the rectangle into connected pieces of min_size..max_size cells, as lists of (x, y) cells.
+
+    Pieces grow from the first free cell in reading order. A piece that would wall off a pocket
+    too small for any piece is regrown up to `retries` times; a scrap still smaller than min_size
+    is merged into a neighbouring piece when that stays within max_size, and the whole cut is
+    retried otherwise.
+    """
+    if min_size < 1 or max_size < min_size:
+        raise ValueError(f"bad piece size range {min_size}-{max_size}")
+    n = w * h
+    if n < min_size:
+        raise ValueError(f"a {w}x{h} card cannot hold a piece of {min_size} cells")
+    neighbours = [[j for j in ((i - 1) if i % w else -1, (i + 1) if (i + 1) % w else -1, i - w, i + w) if 0 <= j < n]
+                  for i in range(n)]
+    for _ in range(attempts):
+        owner = [-1] * n
+        pieces: List[List[int]] = []
+        for start in range(n):
+            if owner[start] >= 0:
+                continue
+            index = len(pieces)
+            for _ in range(retries):
+                cells = _grow(start, index, rng.randint(min_size, max_size), owner, neighbours, rng, tightness)
+                if len(cells) >= min_size and not _cuts_off(cells, owner, neighbours, min_size):
+                    break
+                for i in cells:
+                    owner[i] = -1
+            else:
+                cells = _grow(start, index, max_size, owner, neighbours, rng, tightness)
+            if len(cells) < min_size:
+                hosts = {owner[j] for i in cells for j in neighbours[i]} - {index, -1}
+                hosts = [k for k in hosts if len(pieces[k]) + len(cells) <= max_size]
+                if not hosts:
+                    break
+                host = rng.choice(hosts)
+                for i in cells:
+                    owner[i] = host
+                pieces[host].extend(cells)
+                continue
+            pieces.append(cells)
+        else:
+            return [[(i % w, i // w) for i in cells] for cells in pieces]
+    raise ValueError(f"could not cut a {w}x{h} card into pieces of {min_size}-{max_size} cells")
+
+
+def generate_card(w: int, h: int, min_size: int, max_size: int, rng: random.Random) -> Card:
+    """Returns a random solvable card with its pieces turned and shuffled."""
+    tetraminos = []
+    for cells in partition(w, h, min_size, max_size, rng):
+        table = orientation_table(normalize(cells))
+        tetraminos.append([list(table[rng.randrange(len(table))].cells), rng.choice(COLORS)])
+    rng.shuffle(tetraminos)
+    return (w, h), tetraminos
+
+
+def _generate_batch(task: Tuple[int, int, int, int, int, int]) -> List[str]:
+    """Worker entry point: formats cards seed..seed+count-1; only their text goes back to the parent."""
+    w, h, min_size, max_size, seed, count = task
+    return [format_card(generate_card(w, h, min_size, max_size, random.Random(seed + i))) for i in range(count)]
+
+
+def generate_pack(directory: str, count: int, size: Tuple[int, int], pieces: Tuple[int, int], seed: int = 0,
+                  workers: Optional[int] = None, chunk: int = 500) -> int:
+    """Writes card_00000.txt... into `directory` and returns how many cards were written."""
+    os.makedirs(directory, exist_ok=True)
+    tasks = [(size[0], size[1], pieces[0], pieces[1], seed + start, min(chunk, count - start))
+             for start in range(0, count, chunk)]
+    digits = max(5, len(str(count - 1)))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        batches = map(_generate_batch, tasks)
+        pool = None
+    else:
+        pool = Pool(workers)
+        batches = pool.imap(_generate_batch, tasks)
+    try:
+        written = 0
+        for batch in batches:
+            for text in batch:
+                with open(os.path.join(directory, f"card_{written:0{digits}d}.txt"), "w") as file:
+                    file.write(text)
+                written += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return written
+
+
+def _pair(text: str, separator: str) -> Tuple[int, int]:
+    first, _, second = text.partition(separator)
+    return int(first), int(second or first)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate solvable puzzle cards.")
+    parser.add_argument("directory", help="where to write the cards")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--size", default="5x4", help="target area as WxH")
+    parser.add_argument("--pieces", default="3-5", help="piece size range in cells, as MIN-MAX")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    size = _pair(args.size, "x")
+    pieces = _pair(args.pieces, "-")
+    start = time.perf_counter()
+    written = generate_pack(args.directory, args.count, size, pieces, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"wrote {written} cards to {args.directory} in {elapsed:.2f}s ({written / elapsed:.0f} cards/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import re
+import struct
+import sys
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+Card = Tuple[Tuple[int, int], List[list]]
+
+_INT = re.compile(r'-?\d+')
+_PAIR = re.compile(r'\(\s*(-?\d+)\s*,\s*(-?\d+)\s*\)')
+
+# Binary sidecar: header, then per-piece cell and color counts, then flat coordinate and color arrays.
+# The header records the size and mtime of the text it was built from, so any replaced text,
+# even one with an older mtime, no longer matches.
+_MAGIC = b'TCRD'
+_VERSION = 2
+_HEADER = struct.Struct('<4sHQqiiI')
+Source = Tuple[int, int]
+CACHE_SUFFIX = '.bin'
+
+
+def parse_line(line: str) -> list:
+    """Parses one piece line in either card dialect into [coordinates, color].
+
+    carte.txt style:  (0, 0); (0, 1); (1, 1) ;;0;37;43
+    map_1.txt style:  0, 0; 0, 1; 1, 1;;0, 37, 43
+    """
+    if '(' in line:
+        end = line.rindex(')')
+        coordinates = [(int(x), int(y)) for x, y in _PAIR.findall(line, 0, end + 1)]
+        color = tuple(int(value) for value in _INT.findall(line, end + 1))
+    else:
+        blocks, _, color_info = line.partition(';;')
+        values = [int(value) for value in _INT.findall(blocks)]
+        if len(values) % 2:
+            raise ValueError(f"odd number of coordinates in card line: {line.strip()!r}")
+        coordinates = list(zip(values[::2], values[1::2]))
+        color = tuple(int(value) for value in _INT.findall(color_info))
+    if not coordinates:
+        raise ValueError(f"no coordinates in card line: {line.strip()!r}")
+    return [coordinates, color]
+
+
+def parse_card(lines: Iterable[str]) -> Card:
+    """Parses a card from an iterable of lines: dimensions first, then one piece per line."""
+    lines = iter(lines)
+    first = next(lines, '')
+    values = [int(value) for value in _INT.findall(first)]
+    if len(values) != 2:
+        raise ValueError(f"expected 'w, h' on the first card line, got {first.strip()!r}")
+    tetraminos = [parse_line(line) for line in lines if line.strip()]
+    return (values[0], values[1]), tetraminos
+
+
+def format_card(card: Card) -> str:
+    """Formats a card in the map_1.txt dialect, which parse_card reads back unchanged."""
+    (w, h), tetraminos = card
+    lines = [f"{w}, {h}\n"]
+    for coordinates, color in tetraminos:
+        cells = "; ".join(f"{x}, {y}" for x, y in coordinates)
+        lines.append(f"{cells};;{', '.join(str(value) for value in color)}\n")
+    return "".join(lines)
+
+
+def source_stamp(file_path: str) -> Source:
+    """Size and nanosecond mtime of a card's text file, as stored in its sidecar."""
+    status = os.stat(file_path)
+    return status.st_size, status.st_mtime_ns
+
+
+def write_cache(cache_path: str, card: Card, source: Source = (0, 0)) -> None:
+    """Writes the card as fixed-width little-endian integer arrays, through a temporary file so an
+    interrupted write never leaves half a sidecar. `source` is the text's source_stamp()."""
+    (w, h), tetraminos = card
+    cell_counts = array('I', (len(coordinates) for coordinates, _ in tetraminos))
+    color_counts = array('I', (len(color) for _, color in tetraminos))
+    coords = array('i', (value for coordinates, _ in tetraminos for cell in coordinates for value in cell[:2]))
+    colors = array('i', (value for _, color in tetraminos for value in color))
+    arrays = (cell_counts, color_counts, coords, colors)
+    if sys.byteorder == 'big':
+        for values in arrays:
+            values.byteswap()
+    temporary = cache_path + ".tmp"
+    with open(temporary, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, *source, w, h, len(tetraminos)))
+        for values in arrays:
+            values.tofile(file)
+    os.replace(temporary, cache_path)
+
+
+def read_cache(cache_path: str, source: Optional[Source] = None) -> Card:
+    """Reads a card written by write_cache; raises ValueError when `source` is given and differs from the stored one."""
+    with open(cache_path, 'rb') as file:
+        magic, version, size, mtime_ns, w, h, count = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{cache_path} is not a version {_VERSION} card cache")
+        if source is not None and (size, mtime_ns) != tuple(source):
+            raise ValueError(f"{cache_path} was built from a different version of the card")
+        cell_counts = array('I')
+        cell_counts.fromfile(file, count)
+        color_counts = array('I')
+        color_counts.fromfile(file, count)
+        if sys.byteorder == 'big':
+            cell_counts.byteswap()
+            color_counts.byteswap()
+        coords = array('i')
+        coords.fromfile(file, 2 * sum(cell_counts))
+        colors = array('i')
+        colors.fromfile(file, sum(color_counts))
+    if sys.byteorder == 'big':
+        coords.byteswap()
+        colors.byteswap()
+
+    values = iter(coords.tolist())
+    cells = list(zip(values, values))
+    colors = colors.tolist()
+    tetraminos = []
+    cell = color = 0
+    for n_cells, n_colors in zip(cell_counts, color_counts):
+        tetraminos.append([cells[cell:cell + n_cells], tuple(colors[color:color + n_colors])])
+        cell += n_cells
+        color += n_colors
+    return (w, h), tetraminos
+
+
+def load_card(file_path: str, cache: bool = True) -> Card:
+    """Loads a card in either text dialect, using the binary sidecar when it was built from this exact text file."""
+    cache_path = file_path + CACHE_SUFFIX
+    source = source_stamp(file_path) if cache else None
+    if cache:
+        try:
+            return read_cache(cache_path, source)
+        except (OSError, ValueError, EOFError, struct.error):
+            # A missing, stale, truncated or foreign sidecar is rebuilt from the text below
+            pass
+    with open(file_path, 'r') as file:
+        card = parse_card(file)
+    if cache:
+        try:
+            # Stamped with the stat taken before parsing, so a text edited meanwhile is reread next time
+            write_cache(cache_path, card, source)
+        except OSError:
+            pass
+    return card
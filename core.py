@@ -0,0 +1,78 @@
+"""Rules of the card puzzle, with no GUI imports.
+
+t.py drives these from Tk; scripts, benchmarks and worker processes can import them without
+a display. The grid is the one t.py shows: rows of cell strings, ' ' for an empty cell, and a
+piece is a [cells, color] pair or a piece.Piece.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from cards import Card, load_card
+from piece import Piece
+from regions import EmptyRegions
+from shapes import rotate_cells
+
+Grid = List[List]
+
+
+def import_card(file_path: str) -> Card:
+    return load_card(file_path)
+
+
+def create_grid(w: int, h: int) -> Grid:
+    """The play area: the w×h card plus room around it to park the pieces not yet placed."""
+    return [[' ' for _ in range(3 * w + 2)] for _ in range(3 * h + 2)]
+
+
+def place_tetraminos(grid: Grid, piece) -> Grid:
+    for x, y in piece[0]:
+        grid[y][x] = piece[1]
+    return grid
+
+
+def remove_tetraminos(grid: Grid, piece) -> Grid:
+    for x, y in piece[0]:
+        grid[y][x] = ' '
+    return grid
+
+
+def check_move(piece, grid: Grid) -> bool:
+    """True when every cell of the piece is inside the grid and empty."""
+    for x, y in piece[0]:
+        if x < 0 or y < 0 or x >= len(grid[0]) or y >= len(grid):
+            return False
+        if grid[y][x] != ' ':
+            return False
+    return True
+
+
+def rotate_tetramino(piece, clockwise: bool = True):
+    if isinstance(piece, Piece):
+        return piece.rotated(clockwise)
+    return [rotate_cells(piece[0], clockwise), piece[1]]
+
+
+def check_win(grid: Grid, dimensions: Tuple[int, int], regions: Optional[EmptyRegions] = None) -> bool:
+    """True when every cell of the w×h target area is filled; the parking area around it is ignored.
+
+    With the live regions index, which covers the same area, this is a counter comparison
+    instead of a scan of the target rows.
+    """
+    if regions is not None:
+        return regions.is_full()
+    w, h = dimensions
+    for row in grid[:h]:
+        if ' ' in row[:w]:
+            return False
+    return True
+
+
+def check_dead_end(regions: EmptyRegions, remaining: Iterable) -> bool:
+    """True when some empty pocket can no longer be filled by the pieces still to place."""
+    return regions.dead(len(piece[0]) for piece in remaining)
+
+
+def solve(card: Card) -> Optional[List[List[Tuple[int, int]]]]:
+    """One tiling of the card, as the cells of each piece in card order, or None."""
+    # Imported here so loading a card does not pull in the solver
+    from solver import solve as solve_card
+    return solve_card(*card)
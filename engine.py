@@ -0,0 +1,157 @@
+import random
+import sys
+import time
+from typing import Optional
+
+from board import Board
+from shapes import orientation_table, shape_cells
+from zobrist import piece_key
+
+SHAPES = [
+    [[1, 1, 1, 1]],
+    [[1, 1, 1], [1]],
+    [[1, 1, 1], [0, 0, 1]],
+    [[1, 1, 1], [0, 1]],
+    [[1, 1], [1, 1]],
+    [[1, 1, 1], [0, 1, 0]],
+    [[1, 1, 1], [1, 0]],
+]
+
+# Actions accepted by TetrisEngine.step
+NOOP, LEFT, RIGHT, ROTATE, DOWN, DROP = range(6)
+
+
+class TetrisEngine:
+    """Headless Tetris with the same rules as tetramino.Tetris, driven by step() instead of Tk."""
+
+    def __init__(self, width: int = 10, height: int = 20, seed: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.board = Board(width, height)
+        self.random = random.Random(seed)
+        self.shapes = SHAPES
+        self.current_shape = {"shape": [], "color": ""}
+        self.orientations = ()
+        self.rotation = 0
+        self.current_masks = ()
+        self.current_x = 0
+        self.current_y = 0
+        self.game_over = False
+        self.lines_cleared = 0
+        self.pieces = 0
+        self.ticks = 0
+        self.new_shape()
+
+    def new_shape(self):
+        self.current_shape["shape"] = self.random.choice(self.shapes)
+        self.current_shape["color"] = "#{:06x}".format(self.random.randint(0, 0xFFFFFF))
+        self.current_shape["index"] = self.shapes.index(self.current_shape["shape"])
+        self.orientations = orientation_table(shape_cells(self.current_shape["shape"]))
+        self.rotation = 0
+        self.current_masks = self.orientations[0].masks
+        self.current_x = self.width // 2 - self.orientations[0].width // 2
+        self.current_y = 0
+        self.pieces += 1
+        if not self.board.is_valid_position(self.current_masks, self.current_x, self.current_y):
+            self.game_over = True
+
+    def clear_lines(self) -> int:
+        touched = self.board.lock(self.current_masks, self.current_x, self.current_y)
+        lines_to_clear = self.board.full_rows(touched)
+        self.board.clear_rows(lines_to_clear)
+        self.lines_cleared += len(lines_to_clear)
+        return len(lines_to_clear)
+
+    def move_left(self) -> bool:
+        if self.board.is_valid_position(self.current_masks, self.current_x - 1, self.current_y):
+            self.current_x -= 1
+            return True
+        return False
+
+    def move_right(self) -> bool:
+        if self.board.is_valid_position(self.current_masks, self.current_x + 1, self.current_y):
+            self.current_x += 1
+            return True
+        return False
+
+    def move_down(self) -> int:
+        """Moves the piece down one row, or locks it and spawns the next one. Returns lines cleared."""
+        if self.board.is_valid_position(self.current_masks, self.current_x, self.current_y + 1):
+            self.current_y += 1
+            return 0
+        cleared = self.clear_lines()
+        self.new_shape()
+        return cleared
+
+    def rotate(self) -> bool:
+        rotation = (self.rotation + 1) % len(self.orientations)
+        rotated_masks = self.orientations[rotation].masks
+        if self.board.is_valid_position(rotated_masks, self.current_x, self.current_y):
+            self.rotation = rotation
+            self.current_masks = rotated_masks
+            return True
+        return False
+
+    def hard_drop(self) -> int:
+        """Drops the piece as far as it goes and locks it. Returns lines cleared."""
+        while self.board.is_valid_position(self.current_masks, self.current_x, self.current_y + 1):
+            self.current_y += 1
+        return self.move_down()
+
+    def state_hash(self) -> int:
+        """Zobrist hash of the locked cells plus the falling piece, for spotting repeated states."""
+        return self.board.hash ^ piece_key(self.current_shape["index"], self.rotation, self.current_x, self.current_y)
+
+    def act(self, action: int) -> int:
+        """Applies one player action without a gravity tick. Returns lines cleared."""
+        if self.game_over:
+            return 0
+        if action == LEFT:
+            self.move_left()
+        elif action == RIGHT:
+            self.move_right()
+        elif action == ROTATE:
+            self.rotate()
+        elif action == DOWN:
+            return self.move_down()
+        elif action == DROP:
+            return self.hard_drop()
+        return 0
+
+    def tick(self) -> int:
+        """Applies one gravity tick. Returns lines cleared."""
+        self.ticks += 1
+        if self.game_over:
+            return 0
+        return self.move_down()
+
+    def step(self, action: int = NOOP) -> int:
+        """Applies one player action followed by one gravity tick. Returns lines cleared."""
+        if self.game_over:
+            return 0
+        cleared = self.act(action)
+        return cleared + self.tick()
+
+
+def play_random(seed: int, max_ticks: int = 10000) -> TetrisEngine:
+    """Plays one game with uniformly random actions, for smoke tests and throughput checks."""
+    game = TetrisEngine(seed=seed)
+    actions = random.Random(seed)
+    while not game.game_over and game.ticks < max_ticks:
+        game.step(actions.randrange(5))
+    return game
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    start = time.perf_counter()
+    ticks = 0
+    for seed in range(games):
+        ticks += play_random(seed).ticks
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {ticks} ticks in {elapsed:.2f}s "
+          f"({games / elapsed:.0f} games/s, {ticks / elapsed:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+# Seconds between gravity ticks for each level; the last entry applies to every higher level
+GRAVITY = (0.5, 0.45, 0.4, 0.35, 0.3, 0.25, 0.2, 0.15, 0.1, 0.08, 0.06, 0.05)
+
+
+def gravity_interval(level: int) -> float:
+    return GRAVITY[min(max(level, 0), len(GRAVITY) - 1)]
+
+
+class Timings:
+    """Rolling window of durations, in seconds, with percentile summaries in milliseconds."""
+
+    def __init__(self, size: int = 1024):
+        self.samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentiles(self, points=(50, 95, 99)) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {}
+        summary = {f"p{point}": ordered[min(len(ordered) - 1, len(ordered) * point // 100)] * 1000 for point in points}
+        summary["max"] = ordered[-1] * 1000
+        return summary
+
+
+class FixedStepLoop:
+    """Runs queued input, gravity and redraw once per fixed frame, scheduled with Tk's after().
+
+    Gravity accumulates real elapsed time and ticks at `interval()` seconds regardless of
+    frame jitter; frames are scheduled against absolute deadlines so delays do not drift.
+    `redraw` defaults to the master's update_idletasks, so Tk paints inside the frame and
+    input_latency runs from the key press until the change is on screen.
+    """
+
+    def __init__(self, master, gravity_tick: Callable[[], None], interval: Callable[[], float] = lambda: GRAVITY[0],
+                 redraw: Optional[Callable[[], None]] = None, frame: float = 1 / 60, clock=time.perf_counter):
+        self.master = master
+        self.gravity_tick = gravity_tick
+        self.interval = interval
+        self.redraw = redraw if redraw is not None else master.update_idletasks
+        self.frame_step = frame
+        self.clock = clock
+        self.inputs = []
+        self.running = False
+        self.after_id = None
+        self.accumulator = 0.0
+        self.last = 0.0
+        self.next_frame = 0.0
+        # Catch-up limit so a long stall does not replay a burst of gravity ticks
+        self.max_ticks_per_frame = 5
+        self.frame_time = Timings()
+        self.frame_interval = Timings()
+        self.input_latency = Timings()
+
+    def submit(self, action: Callable[[], None]) -> None:
+        """Queues an input action for the next frame, stamped with the time it arrived."""
+        self.inputs.append((self.clock(), action))
+
+    def start(self) -> None:
+        self.running = True
+        self.last = self.next_frame = self.clock()
+        self.after_id = self.master.after(int(self.frame_step * 1000), self.frame)
+
+    def stop(self) -> None:
+        self.running = False
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+
+    def frame(self) -> None:
+        if not self.running:
+            return
+        start = self.clock()
+        self.frame_interval.record(start - self.last)
+
+        pending, self.inputs = self.inputs, []
+        for _, action in pending:
+            action()
+
+        self.accumulator += start - self.last
+        self.last = start
+        ticks = 0
+        interval = self.interval()
+        while self.accumulator >= interval:
+            if ticks == self.max_ticks_per_frame:
+                self.accumulator = 0.0
+                break
+            self.gravity_tick()
+            self.accumulator -= interval
+            ticks += 1
+
+        self.redraw()
+        end = self.clock()
+        for stamp, _ in pending:
+            self.input_latency.record(end - stamp)
+        self.frame_time.record(end - start)
+
+        self.next_frame += self.frame_step
+        if self.next_frame < end:
+            # Fell behind: skip the missed frames instead of running them back to back
+            self.next_frame = end
+        if self.running:
+            self.after_id = self.master.after(int((self.next_frame - end) * 1000), self.frame)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles, in ms, of frame work time, time between frames and key-to-redraw latency."""
+        return {
+            "frame_time": self.frame_time.percentiles(),
+            "frame_interval": self.frame_interval.percentiles(),
+            "input_latency": self.input_latency.percentiles(),
+        }
@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from solver import Cell, solve_partial
+from zobrist import cell_keys, cells_hash
+
+# Board state: Zobrist hash of the placed pieces, one key layer per piece index
+StateKey = int
+
+
+class Hint(NamedTuple):
+    """The next piece to place and where, or solvable=False when the layout cannot be finished."""
+    solvable: bool
+    piece: Optional[int] = None
+    cells: Tuple[Cell, ...] = ()
+
+
+def state_key(dimensions: Tuple[int, int], n_pieces: int, placed: Dict[int, Iterable[Cell]]) -> StateKey:
+    """Zobrist hash of the placed pieces; the puzzle keeps the same value up to date incrementally."""
+    keys = cell_keys(dimensions[0], dimensions[1], n_pieces)
+    value = 0
+    for index, cells in placed.items():
+        value ^= cells_hash(keys[index], cells)
+    return value
+
+
+def next_hint(placed: Dict[int, Iterable[Cell]], tiling: Optional[List[List[Cell]]]) -> Hint:
+    if tiling is None:
+        return Hint(False)
+    for index, cells in enumerate(tiling):
+        if index not in placed:
+            return Hint(True, index, tuple(cells))
+    # Every piece is already down, so there is nothing left to suggest
+    return Hint(True)
+
+
+class HintEngine:
+    """Answers hints for one card on a background process, memoizing each board state's completion.
+
+    The transposition table is a bounded LRU keyed by the Zobrist hash of the placed pieces, so asking
+    again for a state already seen (a repeated hint, or an undo/redo back to it) is answered without solving.
+    """
+
+    def __init__(self, dimensions: Tuple[int, int], tetraminos, cache_size: int = 4096):
+        self.dimensions = dimensions
+        self.tetraminos = [[list(cells), color] for cells, color in tetraminos]
+        self.cache_size = cache_size
+        self.table: "OrderedDict[StateKey, Optional[List[List[Cell]]]]" = OrderedDict()
+        self.pending: Dict[StateKey, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        # Futures complete on the executor's thread, so the table is shared with it under a lock
+        self.lock = threading.RLock()
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def lookup(self, key: StateKey):
+        """Returns (True, tiling) for a cached state, moving it to the recent end, or (False, None)."""
+        with self.lock:
+            if key in self.table:
+                self.table.move_to_end(key)
+                return True, self.table[key]
+        return False, None
+
+    def store(self, key: StateKey, tiling: Optional[List[List[Cell]]]) -> None:
+        with self.lock:
+            self.table[key] = tiling
+            self.table.move_to_end(key)
+            while len(self.table) > self.cache_size:
+                self.table.popitem(last=False)
+            self.pending.pop(key, None)
+
+    def _finished(self, key: StateKey, solving: Future) -> None:
+        if not solving.cancelled() and solving.exception() is None:
+            self.store(key, solving.result())
+        else:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def request(self, placed: Dict[int, Iterable[Cell]], key: Optional[StateKey] = None) -> "Future[Hint]":
+        """Returns a future for the hint; it is already done when the state is cached.
+
+        `key` is the caller's own state_key() for `placed`, when it keeps one up to date.
+        """
+        placed = {index: [tuple(cell[:2]) for cell in cells] for index, cells in placed.items()}
+        if key is None:
+            key = state_key(self.dimensions, len(self.tetraminos), placed)
+        hint = Future()
+        found, tiling = self.lookup(key)
+        if found:
+            self.hits += 1
+            hint.set_result(next_hint(placed, tiling))
+            return hint
+        self.misses += 1
+        with self.lock:
+            solving = self.pending.get(key)
+            if solving is None:
+                if self.executor is None:
+                    self.executor = ProcessPoolExecutor(max_workers=1)
+                solving = self.executor.submit(solve_partial, self.dimensions, self.tetraminos, placed)
+                solving.add_done_callback(lambda done: self._finished(key, done))
+                self.pending[key] = solving
+        solving.add_done_callback(lambda done: _resolve(hint, done, placed))
+        return hint
+
+    def hint(self, placed: Dict[int, Iterable[Cell]]) -> Hint:
+        """Blocking form of request()."""
+        return self.request(placed).result()
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def _resolve(hint: Future, solving: Future, placed: Dict[int, List[Cell]]) -> None:
+    if solving.cancelled():
+        hint.cancel()
+    elif solving.exception() is not None:
+        hint.set_exception(solving.exception())
+    else:
+        hint.set_result(next_hint(placed, solving.result()))
@@ -0,0 +1,217 @@
+"""Runs many headless Tetris games concurrently on one asyncio event loop.
+
+    python host.py --games 2000 --duration 10                  # random players at 4 actions/s
+    python host.py --games 200 --player bot --think 0.05       # the NumPy bot, one action every 50 ms
+    python host.py --games 2000 --player idle --speed 20       # gravity only, 20x faster than level 0
+
+Every game gets its own gravity timer, paced by its level like tetramino.Tetris, and its own
+action source: an async callable that waits until the player acts and returns an engine
+action code. Gravity ticks are scheduled against absolute deadlines, and how late each one
+runs is recorded per game. That lateness is the latency a player on a crowded host would see.
+"""
+import argparse
+import asyncio
+import random
+import time
+from contextlib import suppress
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from engine import DOWN, DROP, LEFT, RIGHT, ROTATE, TetrisEngine
+from gameloop import Timings, gravity_interval
+
+# Waits for the player's next move in the given game and returns its action code, or None when the player is done
+ActionSource = Callable[[TetrisEngine], Awaitable[Optional[int]]]
+
+
+class Seat:
+    """One hosted game with its action source and counters."""
+
+    def __init__(self, name: str, game: TetrisEngine, source: Optional[ActionSource]):
+        self.name = name
+        self.game = game
+        self.source = source
+        self.actions = 0
+        # Seconds between each gravity tick's deadline and the moment it ran
+        self.lateness = Timings(256)
+
+
+class GameHost:
+    """Schedules any number of TetrisEngine games on the running event loop."""
+
+    def __init__(self, speed: float = 1.0, max_catch_up: int = 5):
+        self.speed = speed
+        # A game that falls this many intervals behind drops the missed ticks instead of replaying them in a burst
+        self.max_catch_up = max_catch_up
+        self.seats: List[Seat] = []
+        self.ticks = 0
+        self.elapsed = 0.0
+
+    def add(self, game: TetrisEngine, source: Optional[ActionSource] = None, name: Optional[str] = None) -> Seat:
+        seat = Seat(name or f"game{len(self.seats)}", game, source)
+        self.seats.append(seat)
+        return seat
+
+    async def _gravity(self, seat: Seat, phase: float) -> None:
+        game = seat.game
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + phase
+        while not game.game_over:
+            interval = gravity_interval(game.lines_cleared // 10) / self.speed
+            deadline += interval
+            # A late game still yields, so it cannot starve the others
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            now = loop.time()
+            seat.lateness.record(now - deadline)
+            if now - deadline > interval * self.max_catch_up:
+                deadline = now
+            game.tick()
+            self.ticks += 1
+
+    @staticmethod
+    async def _play(seat: Seat) -> None:
+        game = seat.game
+        while not game.game_over:
+            action = await seat.source(game)
+            if action is None:
+                return
+            game.act(action)
+            seat.actions += 1
+
+    async def _run_seat(self, seat: Seat, phase: float) -> None:
+        player = asyncio.create_task(self._play(seat)) if seat.source is not None else None
+        try:
+            await self._gravity(seat, phase)
+        finally:
+            if player is not None:
+                player.cancel()
+                # Re-raises whatever stopped the action source, other than the cancel itself
+                with suppress(asyncio.CancelledError):
+                    await player
+
+    async def run(self, duration: Optional[float] = None) -> float:
+        """Plays every added game until all are over or `duration` seconds have passed; returns the seconds taken."""
+        start = time.perf_counter()
+        # Games start spread over one gravity interval, so their ticks do not all fall due together
+        spread = gravity_interval(0) / self.speed / max(1, len(self.seats))
+        tasks = [asyncio.create_task(self._run_seat(seat, n * spread)) for n, seat in enumerate(self.seats)]
+        try:
+            await asyncio.wait(tasks, timeout=duration)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            self.elapsed += time.perf_counter() - start
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return self.elapsed
+
+    def stats(self) -> Dict[str, float]:
+        """Aggregate throughput, plus tick lateness in ms over all games and for the worst game."""
+        everything = Timings(None)
+        worst: Dict[str, float] = {}
+        for seat in self.seats:
+            everything.samples.extend(seat.lateness.samples)
+            summary = seat.lateness.percentiles()
+            if summary and summary["p99"] > worst.get("p99", -1.0):
+                worst = summary
+        elapsed = self.elapsed or float("inf")
+        stats = {
+            "games": len(self.seats),
+            "finished": sum(seat.game.game_over for seat in self.seats),
+            "ticks": self.ticks,
+            "actions": sum(seat.actions for seat in self.seats),
+            "seconds": self.elapsed,
+            "ticks_per_s": self.ticks / elapsed,
+            "actions_per_s": sum(seat.actions for seat in self.seats) / elapsed,
+        }
+        stats.update({f"latency_{name}_ms": value for name, value in everything.percentiles().items()})
+        stats.update({f"worst_game_{name}_ms": value for name, value in worst.items()})
+        return stats
+
+    def report(self) -> str:
+        stats = self.stats()
+        lines = [f"{stats['games']} games ({stats['finished']} over) in {stats['seconds']:.2f}s: "
+                 f"{stats['ticks']} ticks ({stats['ticks_per_s']:.0f}/s), "
+                 f"{stats['actions']} actions ({stats['actions_per_s']:.0f}/s)"]
+        if "latency_p50_ms" in stats:
+            lines.append(f"tick lateness: p50 {stats['latency_p50_ms']:.2f} ms, p95 {stats['latency_p95_ms']:.2f} ms, "
+                         f"p99 {stats['latency_p99_ms']:.2f} ms, max {stats['latency_max_ms']:.2f} ms; "
+                         f"worst game p99 {stats['worst_game_p99_ms']:.2f} ms")
+        return "\n".join(lines)
+
+
+def random_player(rate: float, seed: Optional[int] = None) -> ActionSource:
+    """Presses a random move or rotate key `rate` times a second on average, like engine.play_random."""
+    rng = random.Random(seed)
+
+    async def source(game: TetrisEngine) -> int:
+        await asyncio.sleep(rng.expovariate(rate))
+        return rng.randrange(LEFT, DROP)
+    return source
+
+
+def bot_player(bot, think: float) -> ActionSource:
+    """Steers each piece to the bot's placement, one action every `think` seconds, then drops it.
+
+    A bot.Bot can be shared by any number of games; it only caches per-shape tables.
+    """
+    target = {}
+
+    async def source(game: TetrisEngine) -> int:
+        await asyncio.sleep(think)
+        if target.get("piece") != game.pieces:
+            placement = bot.best_placement(game.board, game.orientations)
+            target.update(piece=game.pieces, placement=placement)
+        placement = target["placement"]
+        if placement is None:
+            return DOWN
+        if game.rotation != placement.rotation:
+            return ROTATE
+        if game.current_x < placement.x:
+            return RIGHT
+        if game.current_x > placement.x:
+            return LEFT
+        return DROP
+    return source
+
+
+def queue_player(actions: "asyncio.Queue[Optional[int]]") -> ActionSource:
+    """Takes actions from a queue fed by another task, such as a network client; None ends the stream."""
+
+    async def source(game: TetrisEngine) -> Optional[int]:
+        return await actions.get()
+    return source
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Run many headless Tetris games on one event loop.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0, help="stop after this many seconds")
+    parser.add_argument("--speed", type=float, default=1.0, help="gravity speed-up factor")
+    parser.add_argument("--player", choices=("random", "bot", "idle"), default="random")
+    parser.add_argument("--rate", type=float, default=4.0, help="random player actions per second")
+    parser.add_argument("--think", type=float, default=0.1, help="bot player seconds per action")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    host = GameHost(speed=args.speed)
+    bot = None
+    if args.player == "bot":
+        # Imported here so the host itself does not need NumPy
+        from bot import Bot
+        bot = Bot()
+    for n in range(args.games):
+        seed = args.seed + n
+        source = None
+        if args.player == "random":
+            source = random_player(args.rate, seed)
+        elif args.player == "bot":
+            source = bot_player(bot, args.think)
+        host.add(TetrisEngine(seed=seed), source)
+    asyncio.run(host.run(args.duration))
+    print(host.report())
+
+
+if __name__ == "__main__":
+    main()
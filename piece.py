@@ -0,0 +1,107 @@
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from shapes import Cell, Orientation, find_orientation, orientation_table
+
+
+class Piece:
+    """Immutable placed piece: a shared orientation table, the rotation in use, and the top-left
+    corner of its bounding box.
+
+    The cells themselves live once per shape in the orientation table (as a cell tuple and row
+    bitmasks), so a piece is a handful of small fields. Pieces are interned by state: moving or
+    rotating onto a state seen before returns the same Piece, with its absolute cells already
+    worked out, so the only allocation left is the lookup key. Colors must therefore be hashable.
+    It also reads like the cards' [cells, color] pairs: piece[0] is its absolute cells and piece[1]
+    its color.
+    """
+
+    __slots__ = ("table", "rotation", "x", "y", "color", "_cells")
+
+    def __init__(self, table: Tuple[Orientation, ...], rotation: int = 0, x: int = 0, y: int = 0, color=None):
+        setattr_ = object.__setattr__
+        setattr_(self, "table", table)
+        setattr_(self, "rotation", rotation)
+        setattr_(self, "x", x)
+        setattr_(self, "y", y)
+        setattr_(self, "color", color)
+        setattr_(self, "_cells", None)
+
+    @classmethod
+    def from_cells(cls, cells: Sequence[Cell], color=None) -> "Piece":
+        """Builds the piece occupying exactly these (x, y) cells."""
+        table, rotation = find_orientation(cells)
+        return piece_at(table, rotation, min(cell[0] for cell in cells), min(cell[1] for cell in cells), color)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Piece is immutable; use moved() or rotated()")
+
+    def __reduce__(self):
+        # Rebuild through orientation_table so the unpickled piece shares the process's table
+        return _restore, (self.table[0].cells, self.rotation, self.x, self.y, self.color)
+
+    @property
+    def orientation(self) -> Orientation:
+        return self.table[self.rotation]
+
+    @property
+    def masks(self) -> Tuple[int, ...]:
+        """Row bitmasks relative to (x, y), as Board.is_valid_position takes them."""
+        return self.table[self.rotation].masks
+
+    @property
+    def cells(self) -> Tuple[Cell, ...]:
+        """Absolute cells; worked out on first use and kept, since the piece never changes."""
+        cells = self._cells
+        if cells is None:
+            x, y = self.x, self.y
+            cells = tuple((cx + x, cy + y) for cx, cy in self.table[self.rotation].cells)
+            object.__setattr__(self, "_cells", cells)
+        return cells
+
+    def moved(self, dx: int, dy: int) -> "Piece":
+        return piece_at(self.table, self.rotation, self.x + dx, self.y + dy, self.color)
+
+    def rotated(self, clockwise: bool = True) -> "Piece":
+        """Next rotation in the table, keeping the top-left corner of the bounding box like rotate_cells."""
+        rotation = (self.rotation + (1 if clockwise else -1)) % len(self.table)
+        return piece_at(self.table, rotation, self.x, self.y, self.color)
+
+    def __getitem__(self, index: int):
+        return (self.cells, self.color)[index]
+
+    def __len__(self) -> int:
+        return 2
+
+    def __iter__(self) -> Iterator:
+        yield self.cells
+        yield self.color
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Piece):
+            return NotImplemented
+        return (self.table is other.table and self.rotation == other.rotation and self.x == other.x
+                and self.y == other.y and self.color == other.color)
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.rotation, self.x, self.y))
+
+    def __repr__(self) -> str:
+        return f"Piece({list(self.cells)!r}, color={self.color!r})"
+
+
+# Every piece state built so far. Orientation tables are cached for the life of the process, so
+# their id is a stable key; a game only visits the positions on its board, which bounds the size.
+_states: Dict[tuple, Piece] = {}
+
+
+def piece_at(table: Tuple[Orientation, ...], rotation: int, x: int, y: int, color=None) -> Piece:
+    """The interned Piece for this state."""
+    key = (id(table), rotation, x, y, color)
+    piece = _states.get(key)
+    if piece is None:
+        piece = _states[key] = Piece(table, rotation, x, y, color)
+    return piece
+
+
+def _restore(cells: Tuple[Cell, ...], rotation: int, x: int, y: int, color: Optional[tuple]) -> Piece:
+    return piece_at(orientation_table(cells), rotation, x, y, color)
@@ -0,0 +1,136 @@
+"""Named timing spans for the game loops, kept in a ring buffer.
+
+Nothing is timed until a function is instrumented, so a normal run pays no cost at all:
+
+    from profiling import profiler
+    profiler.instrument(Tetris, {"update": "tick", "draw_shape": "render.draw_shape"})
+    with profiler.span("load"):
+        ...
+    profiler.write_chrome_trace("trace.json")   # open in chrome://tracing or ui.perfetto.dev
+    print(profiler.report())                    # per-span percentiles and a log2 histogram
+
+tetramino.py and t.py take --profile PATH to do all of this for their hot paths.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# (name, start ns, duration ns, thread id)
+Span = Tuple[str, int, int, int]
+
+
+class Profiler:
+    """Collects spans into a bounded deque; once it is full the oldest spans are dropped."""
+
+    def __init__(self, capacity: int = 1 << 16):
+        self.spans = deque(maxlen=capacity)
+        self.dropped = 0
+        self.clock = time.perf_counter_ns
+        self.origin = self.clock()
+
+    def record(self, name: str, start: int, end: int) -> None:
+        if len(self.spans) == self.spans.maxlen:
+            self.dropped += 1
+        self.spans.append((name, start, end - start, threading.get_ident()))
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(name, start, self.clock())
+
+    def wrap(self, function: Callable, name: str) -> Callable:
+        clock = self.clock
+        record = self.record
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, clock())
+        timed.__wrapped_by_profiler__ = True
+        return timed
+
+    def instrument(self, owner, names: Dict[str, str]) -> None:
+        """Replaces owner.attr (a class or module attribute) with a timed version for each attr -> span name.
+
+        Instrument before instances are created or callbacks are bound, so every caller sees the timed version.
+        """
+        for attribute, name in names.items():
+            function = getattr(owner, attribute)
+            if not getattr(function, "__wrapped_by_profiler__", False):
+                setattr(owner, attribute, self.wrap(function, name))
+
+    def clear(self) -> None:
+        self.spans.clear()
+        self.dropped = 0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per span name: count, total ms, and mean/p50/p95/p99/max in microseconds."""
+        durations: Dict[str, List[int]] = {}
+        for name, _, duration, _ in self.spans:
+            durations.setdefault(name, []).append(duration)
+        summary = {}
+        for name, values in durations.items():
+            values.sort()
+            n = len(values)
+            summary[name] = {
+                "count": n,
+                "total_ms": sum(values) / 1e6,
+                "mean_us": sum(values) / n / 1e3,
+                "p50_us": values[n // 2] / 1e3,
+                "p95_us": values[min(n - 1, n * 95 // 100)] / 1e3,
+                "p99_us": values[min(n - 1, n * 99 // 100)] / 1e3,
+                "max_us": values[-1] / 1e3,
+            }
+        return summary
+
+    def histogram(self, name: str) -> Dict[int, int]:
+        """Counts of the span's durations in power-of-two microsecond buckets, keyed by the bucket's upper bound."""
+        buckets: Dict[int, int] = {}
+        for span_name, _, duration, _ in self.spans:
+            if span_name == name:
+                bound = 1 << max(0, (duration // 1000)).bit_length()
+                buckets[bound] = buckets.get(bound, 0) + 1
+        return dict(sorted(buckets.items()))
+
+    def report(self) -> str:
+        summary = self.summary()
+        lines = [f"{'span':<28}{'count':>8}{'total ms':>11}{'mean us':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>10}"]
+        for name, stats in sorted(summary.items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(f"{name:<28}{stats['count']:>8}{stats['total_ms']:>11.2f}{stats['mean_us']:>10.1f}"
+                         f"{stats['p50_us']:>9.1f}{stats['p95_us']:>9.1f}{stats['p99_us']:>9.1f}{stats['max_us']:>10.1f}")
+            buckets = self.histogram(name)
+            peak = max(buckets.values())
+            for bound, count in buckets.items():
+                lines.append(f"    < {bound:>6} us {count:>8} {'#' * max(1, count * 40 // peak)}")
+        if self.dropped:
+            lines.append(f"({self.dropped} older spans dropped from the ring buffer)")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict:
+        """The buffered spans as Chrome trace complete events; nested calls nest by their timestamps."""
+        pid = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {"name": name, "ph": "X", "ts": (start - self.origin) / 1e3, "dur": duration / 1e3, "pid": pid, "tid": tid}
+                for name, start, duration, tid in self.spans
+            ],
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+
+
+profiler = Profiler()
@@ -0,0 +1,156 @@
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+def formable_sizes(piece_sizes: Iterable[int]) -> int:
+    """Bitset of every total reachable by a subset of the pieces (bit n set = n cells can be filled)."""
+    reachable = 1
+    for size in piece_sizes:
+        reachable |= reachable << size
+    return reachable
+
+
+def has_gaps(piece_sizes: List[int]) -> bool:
+    """True when some pocket size from the smallest piece up to the total less the smallest piece
+    cannot be filled exactly by the pieces.
+
+    A pocket smaller than every piece leaves cells that no placement fits, and an exact-cover
+    search finds those on its own. Sizes above total - smallest are the same gaps seen from the
+    other side, since the rest of the area is then a pocket smaller than every piece. Only the
+    gaps in between make a pocket check worth its cost.
+    """
+    if not piece_sizes:
+        return False
+    smallest = min(piece_sizes)
+    reachable = formable_sizes(piece_sizes)
+    return any(not reachable >> size & 1 for size in range(smallest, sum(piece_sizes) - smallest + 1))
+
+
+def mask_pocket_sizes(open_mask: int, stride: int) -> Iterator[int]:
+    """Sizes of the 4-connected groups of set bits in a board bitmask, one row every `stride` bits.
+
+    Rows must be padded with at least one clear bit on the right so that shifting by one never
+    wraps into the next row. Each pocket grows from its lowest cell by whole-board shifts, so the
+    cost is a few big-int operations per row of pocket rather than work per cell.
+    """
+    while open_mask:
+        pocket = open_mask & -open_mask
+        while True:
+            grown = (pocket | pocket << 1 | pocket >> 1 | pocket << stride | pocket >> stride) & open_mask
+            if grown == pocket:
+                break
+            pocket = grown
+        open_mask ^= pocket
+        yield bin(pocket).count("1")
+
+
+class EmptyRegions:
+    """Live index of the empty cells of a w×h grid.
+
+    Keeps a count of empty cells, so checking for a full grid is O(1), and the pockets of
+    connected empty cells as sets, so they can be tested against the pieces left. Changes only
+    touch the pockets around the changed cells: emptying a cell merges the pockets next to it,
+    smaller into larger, and filling cells re-floods just the pockets they were taken from.
+    """
+
+    def __init__(self, width: int, height: int, filled: Iterable[Cell] = ()):
+        self.width = width
+        self.height = height
+        n = width * height
+        self.open = bytearray([1]) * n
+        self.empty = n
+        # Pocket id of each open cell, and the cells of each pocket
+        self.pocket_of = [0] * n
+        self.members: Dict[int, Set[int]] = {0: set(range(n))} if n else {}
+        self.next_id = 1
+        self.fill(filled)
+
+    def _index(self, cell: Cell) -> int:
+        x, y = cell[:2]
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return -1
+
+    def _neighbours(self, i: int) -> Iterator[int]:
+        width = self.width
+        x = i % width
+        if x:
+            yield i - 1
+        if x + 1 < width:
+            yield i + 1
+        if i >= width:
+            yield i - width
+        if i + width < len(self.open):
+            yield i + width
+
+    def fill(self, cells: Iterable[Cell]) -> None:
+        """Fills cells; cells outside the grid are ignored."""
+        touched = set()
+        for cell in cells:
+            i = self._index(cell)
+            if i >= 0 and self.open[i]:
+                self.open[i] = 0
+                self.empty -= 1
+                pocket = self.pocket_of[i]
+                self.members[pocket].discard(i)
+                touched.add(pocket)
+        for pocket in touched:
+            self._split(pocket)
+
+    def _split(self, pocket: int) -> None:
+        """Re-floods what is left of a pocket after cells were taken out of it."""
+        remaining = self.members.pop(pocket)
+        while remaining:
+            start = remaining.pop()
+            component = {start}
+            stack = [start]
+            while stack:
+                for j in self._neighbours(stack.pop()):
+                    if j in remaining:
+                        remaining.remove(j)
+                        component.add(j)
+                        stack.append(j)
+            # The first piece keeps the old id; only pieces cut off from it are relabelled
+            if pocket in self.members:
+                pocket = self.next_id
+                self.next_id += 1
+                for i in component:
+                    self.pocket_of[i] = pocket
+            self.members[pocket] = component
+
+    def clear(self, cells: Iterable[Cell]) -> None:
+        """Empties cells; cells outside the grid are ignored."""
+        open_cells, pocket_of, members = self.open, self.pocket_of, self.members
+        for cell in cells:
+            i = self._index(cell)
+            if i < 0 or open_cells[i]:
+                continue
+            open_cells[i] = 1
+            self.empty += 1
+            around = {pocket_of[j] for j in self._neighbours(i) if open_cells[j]}
+            if not around:
+                pocket = self.next_id
+                self.next_id += 1
+                members[pocket] = set()
+            else:
+                pocket = max(around, key=lambda p: len(members[p]))
+                for other in around - {pocket}:
+                    moved = members.pop(other)
+                    for j in moved:
+                        pocket_of[j] = pocket
+                    members[pocket] |= moved
+            pocket_of[i] = pocket
+            members[pocket].add(i)
+
+    def is_full(self) -> bool:
+        return self.empty == 0
+
+    def pockets(self) -> List[int]:
+        """Sizes of the groups of connected empty cells."""
+        return [len(cells) for cells in self.members.values()]
+
+    def dead(self, piece_sizes: Iterable[int]) -> bool:
+        """True when some pocket cannot be filled exactly by any subset of the given pieces."""
+        reachable = formable_sizes(piece_sizes)
+        return any(not reachable >> pocket & 1 for pocket in self.pockets())
@@ -0,0 +1,161 @@
+"""Compact binary replays of seeded Tetris games.
+
+    python replay.py game.trpl [...]        # re-run replays headlessly and check the final line counts
+    python tetramino.py --record game.trpl  # play in Tk and save the session on exit
+    python tetramino.py --replay game.trpl  # watch a replay in Tk (add --speed 4 to fast-forward)
+
+A game is fully determined by its seed and the order of player actions and gravity ticks,
+so that is all a replay stores: a header with the seed and board size, then one varint per
+action holding the gravity ticks since the previous action (high bits) and the action code
+(low three bits). Most records are a single byte. The stream ends with an END record carrying
+the trailing ticks, followed by the lines cleared, which playback checks against.
+"""
+import struct
+import sys
+import time
+from typing import List, NamedTuple, Tuple
+
+from engine import TetrisEngine
+
+_MAGIC = b'TRPL'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHQHH')
+_ACTION_BITS = 3
+# Action code that closes the event stream; engine actions must stay below it
+END = (1 << _ACTION_BITS) - 1
+# Seeds are stored unsigned in 64 bits; random.Random folds negative seeds onto their absolute value,
+# so a wrapped seed would replay a different game
+MAX_SEED = (1 << 64) - 1
+
+
+class Replay(NamedTuple):
+    seed: int
+    width: int
+    height: int
+    events: List[Tuple[int, int]]  # (gravity ticks before the action, action code)
+    ticks: int
+    lines: int
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if position >= len(data):
+            raise ValueError("replay stream ends in the middle of a record")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class Recorder:
+    """Collects the actions and gravity ticks of one game as they happen."""
+
+    def __init__(self, seed: int, width: int = 10, height: int = 20):
+        if not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"seed {seed} does not fit in a replay header (0..2**64-1)")
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.ticks = 0
+        self.last = 0
+        self.stream = bytearray()
+
+    def action(self, code: int) -> None:
+        if not 0 <= code < END:
+            raise ValueError(f"action code {code} does not fit in a replay record")
+        _write_varint(self.stream, (self.ticks - self.last) << _ACTION_BITS | code)
+        self.last = self.ticks
+
+    def tick(self) -> None:
+        self.ticks += 1
+
+    def to_bytes(self, lines: int) -> bytes:
+        out = bytearray(_HEADER.pack(_MAGIC, _VERSION, self.seed, self.width, self.height))
+        out += self.stream
+        _write_varint(out, (self.ticks - self.last) << _ACTION_BITS | END)
+        _write_varint(out, lines)
+        return bytes(out)
+
+    def save(self, path: str, lines: int) -> None:
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes(lines))
+
+
+def loads(data: bytes) -> Replay:
+    if len(data) < _HEADER.size:
+        raise ValueError("replay is shorter than its header")
+    magic, version, seed, width, height = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"not a version {_VERSION} replay")
+    events = []
+    tick = 0
+    position = _HEADER.size
+    while True:
+        value, position = _read_varint(data, position)
+        tick += value >> _ACTION_BITS
+        code = value & END
+        if code == END:
+            break
+        events.append((tick, code))
+    lines, _ = _read_varint(data, position)
+    return Replay(seed, width, height, events, tick, lines)
+
+
+def load(path: str) -> Replay:
+    with open(path, 'rb') as file:
+        return loads(file.read())
+
+
+def play_headless(replay: Replay) -> TetrisEngine:
+    """Re-runs a replay on the headless engine as fast as possible and returns the finished game."""
+    game = TetrisEngine(replay.width, replay.height, seed=replay.seed)
+    tick = game.tick
+    act = game.act
+    ticks = 0
+    for at, action in replay.events:
+        while ticks < at:
+            tick()
+            ticks += 1
+        act(action)
+    while ticks < replay.ticks:
+        tick()
+        ticks += 1
+    return game
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python replay.py REPLAY [REPLAY ...]")
+        return 2
+    failures = 0
+    # Replays that end in the same state after the same number of ticks are reported as duplicates
+    seen = {}
+    for path in argv:
+        replay = load(path)
+        start = time.perf_counter()
+        game = play_headless(replay)
+        elapsed = time.perf_counter() - start
+        status = "ok" if game.lines_cleared == replay.lines else f"MISMATCH (recorded {replay.lines})"
+        failures += game.lines_cleared != replay.lines
+        print(f"{path}: {len(replay.events)} actions, {replay.ticks} ticks, {game.lines_cleared} lines {status}; "
+              f"{replay.ticks / elapsed if elapsed else 0:.0f} ticks/s")
+        state = (game.state_hash(), replay.ticks)
+        if state in seen:
+            print(f"  same final state as {seen[state]}")
+        seen.setdefault(state, path)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
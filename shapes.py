@@ -0,0 +1,80 @@
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+Cell = Tuple[int, int]
+
+
+class Orientation(NamedTuple):
+    """One rotation of a piece, normalized so its bounding box starts at (0, 0)."""
+    cells: Tuple[Cell, ...]
+    width: int
+    height: int
+    masks: Tuple[int, ...]  # one bitmask per row, bit x set when (x, row) is filled
+
+
+# Orientation tables keyed by the normalized cells of their first orientation
+_tables: Dict[Tuple[Cell, ...], Tuple[Orientation, ...]] = {}
+# Normalized cells -> (table, index of those cells in the table)
+_lookup: Dict[Tuple[Cell, ...], Tuple[Tuple[Orientation, ...], int]] = {}
+
+
+def normalize(cells: Sequence[Cell]) -> Tuple[Cell, ...]:
+    """Shifts cells so the smallest x and y are 0, and sorts them."""
+    min_x = min(cell[0] for cell in cells)
+    min_y = min(cell[1] for cell in cells)
+    return tuple(sorted((cell[0] - min_x, cell[1] - min_y) for cell in cells))
+
+
+def _orientation(cells: Tuple[Cell, ...]) -> Orientation:
+    width = max(x for x, _ in cells) + 1
+    height = max(y for _, y in cells) + 1
+    masks = [0] * height
+    for x, y in cells:
+        masks[y] |= 1 << x
+    return Orientation(cells, width, height, tuple(masks))
+
+
+def orientation_table(cells: Sequence[Cell]) -> Tuple[Orientation, ...]:
+    """Returns the distinct clockwise rotations of a piece, starting with the given one.
+
+    Symmetric pieces get fewer entries (one for O, two for I/S/Z), so rotating is
+    `(index + 1) % len(table)` and searches never try the same footprint twice.
+    """
+    key = normalize(cells)
+    table = _tables.get(key)
+    if table is None:
+        found = []
+        current = key
+        for _ in range(4):
+            if current in found:
+                break
+            found.append(current)
+            current = normalize([(-y, x) for x, y in current])
+        table = tuple(_orientation(shape) for shape in found)
+        _tables[key] = table
+        for index, orientation in enumerate(table):
+            _lookup.setdefault(orientation.cells, (table, index))
+    return table
+
+
+def shape_cells(shape: List[List[int]]) -> Tuple[Cell, ...]:
+    """Converts a nested-list shape such as [[1, 1, 1], [0, 1]] into its filled (x, y) cells."""
+    return tuple((x, y) for y, row in enumerate(shape) for x, cell in enumerate(row) if cell)
+
+
+def find_orientation(cells: Sequence[Cell]) -> Tuple[Tuple[Orientation, ...], int]:
+    """Returns the orientation table the cells belong to and which rotation they are in it."""
+    key = normalize(cells)
+    entry = _lookup.get(key)
+    if entry is None:
+        orientation_table(key)
+        entry = _lookup[key]
+    return entry
+
+
+def rotate_cells(cells: Sequence[Cell], clockwise: bool = True) -> List[Cell]:
+    """Rotates placed cells using the orientation table, keeping the top-left corner of the bounding box."""
+    table, index = find_orientation(cells)
+    rotated = table[(index + (1 if clockwise else -1)) % len(table)]
+    min_x = min(cell[0] for cell in cells)
+    min_y = min(cell[1] for cell in cells)
+    return [(x + min_x, y + min_y) for x, y in rotated.cells]
@@ -0,0 +1,443 @@
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from regions import formable_sizes, has_gaps, mask_pocket_sizes
+from shapes import orientation_table
+
+Cell = Tuple[int, int]
+Placement = Tuple[int, Tuple[Cell, ...]]
+
+
+def placements(dimensions: Tuple[int, int], tetraminos) -> List[Placement]:
+    """Lists every (piece index, covered cells) that fits inside the w×h target area."""
+    w, h = dimensions
+    rows = []
+    for index, tetramino in enumerate(tetraminos):
+        for orientation in orientation_table(tetramino[0]):
+            for dy in range(h - orientation.height + 1):
+                for dx in range(w - orientation.width + 1):
+                    rows.append((index, tuple((x + dx, y + dy) for x, y in orientation.cells)))
+    return rows
+
+
+class DancingLinks:
+    """Knuth's Algorithm X on a toroidal doubly linked list stored in flat integer arrays."""
+
+    def __init__(self, n_columns: int, rows: List[List[int]]):
+        # Node 0 is the root, nodes 1..n_columns are the column headers
+        size = n_columns + 1 + sum(len(row) for row in rows)
+        self.left = list(range(-1, size - 1))
+        self.right = list(range(1, size + 1))
+        self.up = list(range(size))
+        self.down = list(range(size))
+        self.column = list(range(size))
+        self.row = [-1] * size
+        self.size = [0] * (n_columns + 1)
+        self.left[0] = n_columns
+        self.right[n_columns] = 0
+        self.first = []
+        # Optional callable polled every 1024 search nodes; the search stops once it returns True
+        self.abort = None
+        self.aborted = False
+        # Optional callable given the links at every search node; the branch is abandoned when it returns True
+        self.prune = None
+        self.nodes = 0
+        # Symmetry breaking between interchangeable pieces, set up by order_twins()
+        self.row_twin = None
+        self.twin_before = None
+        self.twins = []
+        self.placed = None
+
+        node = n_columns + 1
+        for row_index, columns in enumerate(rows):
+            start = node
+            self.first.append(start)
+            for col in columns:
+                col += 1
+                self.column[node] = col
+                self.row[node] = row_index
+                self.up[node] = self.up[col]
+                self.down[node] = col
+                self.down[self.up[col]] = node
+                self.up[col] = node
+                self.size[col] += 1
+                self.left[node] = node - 1
+                self.right[node] = node + 1
+                node += 1
+            if start < node:
+                self.left[start] = node - 1
+                self.right[node - 1] = start
+
+    def cover(self, col: int) -> None:
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col: int) -> None:
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def order_twins(self, groups: List[List[int]]) -> None:
+        """Makes each group of interchangeable columns (the piece columns of pieces with the same shape)
+        get placed in order, so a tiling is found once rather than once per permutation of the twins.
+
+        Twin columns become secondary: they leave the header list, so the search never branches on
+        them, and a row of a twin is only tried once the twin before it is placed. Covering every other
+        column leaves exactly the twins' area, so all of them still end up placed.
+        """
+        left, right, column = self.left, self.right, self.column
+        self.twin_before = [-1] * len(self.size)
+        for group in groups:
+            previous = 0
+            for col in group:
+                col += 1
+                right[left[col]] = right[col]
+                left[right[col]] = left[col]
+                left[col] = right[col] = col
+                self.twin_before[col] = previous
+                previous = col
+        self.twins = [col for col, before in enumerate(self.twin_before) if before >= 0]
+        self.placed = bytearray(len(self.size))
+        # Twin column of each row, or 0 for rows of pieces without twins
+        self.row_twin = [0] * len(self.first)
+        for row_index, start in enumerate(self.first):
+            node = start
+            while True:
+                if self.twin_before[column[node]] >= 0:
+                    self.row_twin[row_index] = column[node]
+                    break
+                node = right[node]
+                if node == start:
+                    break
+
+    def _enter(self, row_index: int) -> bool:
+        """Marks the row's twin placed, or returns False while the twin before it is still unplaced."""
+        col = self.row_twin[row_index]
+        if not col:
+            return True
+        before = self.twin_before[col]
+        if before and not self.placed[before]:
+            return False
+        self.placed[col] = 1
+        return True
+
+    def _leave(self, row_index: int) -> None:
+        col = self.row_twin[row_index]
+        if col:
+            self.placed[col] = 0
+
+    def choose_column(self) -> int:
+        """Picks the column with the fewest remaining rows (Knuth's S heuristic)."""
+        right, size = self.right, self.size
+        best = right[0]
+        best_size = size[best]
+        col = right[best]
+        while col != 0 and best_size > 1:
+            if size[col] < best_size:
+                best = col
+                best_size = size[col]
+            col = right[col]
+        return best
+
+    def search(self, partial: Optional[List[int]] = None) -> Iterator[List[int]]:
+        """Yields every exact cover as a list of row indexes."""
+        if partial is None:
+            partial = []
+        if self.right[0] == 0:
+            yield list(partial)
+            return
+        self.nodes += 1
+        if self.abort is not None and not self.nodes & 1023 and self.abort():
+            self.aborted = True
+        if self.aborted:
+            return
+        col = self.choose_column()
+        if self.size[col] == 0:
+            return
+        # Forced columns are cheap to follow, so the prune check only runs where the search would branch
+        if self.size[col] > 1 and self.prune is not None and self.prune(self):
+            return
+        right, left, down, column = self.right, self.left, self.down, self.column
+        ordered = self.row_twin is not None
+        self.cover(col)
+        r = down[col]
+        while r != col:
+            row_index = self.row[r]
+            if ordered and not self._enter(row_index):
+                r = down[r]
+                continue
+            partial.append(row_index)
+            j = right[r]
+            while j != r:
+                self.cover(column[j])
+                j = right[j]
+            yield from self.search(partial)
+            j = left[r]
+            while j != r:
+                self.uncover(column[j])
+                j = left[j]
+            partial.pop()
+            if ordered:
+                self._leave(row_index)
+            if self.aborted:
+                break
+            r = down[r]
+        self.uncover(col)
+
+    def select(self, row_index: int) -> None:
+        """Commits to a row by covering every column it fills."""
+        if self.row_twin is not None:
+            self._enter(row_index)
+        start = self.first[row_index]
+        self.cover(self.column[start])
+        j = self.right[start]
+        while j != start:
+            self.cover(self.column[j])
+            j = self.right[j]
+
+    def branches(self, depth: int, partial: Optional[List[int]] = None) -> Iterator[List[int]]:
+        """Yields the partial covers found `depth` levels down the search tree, plus any shorter complete ones."""
+        if partial is None:
+            partial = []
+        if depth == 0 or self.right[0] == 0:
+            yield list(partial)
+            return
+        col = self.choose_column()
+        if self.size[col] == 0:
+            return
+        right, left, down, column = self.right, self.left, self.down, self.column
+        ordered = self.row_twin is not None
+        self.cover(col)
+        r = down[col]
+        while r != col:
+            row_index = self.row[r]
+            if ordered and not self._enter(row_index):
+                r = down[r]
+                continue
+            partial.append(row_index)
+            j = right[r]
+            while j != r:
+                self.cover(column[j])
+                j = right[j]
+            yield from self.branches(depth - 1, partial)
+            j = left[r]
+            while j != r:
+                self.uncover(column[j])
+                j = left[j]
+            partial.pop()
+            if ordered:
+                self._leave(row_index)
+            r = down[r]
+        self.uncover(col)
+
+
+def exact_cover(dimensions: Tuple[int, int], tetraminos, fixed: Iterable[int] = ()) -> Tuple[List[Placement], Optional[DancingLinks]]:
+    """Builds the exact-cover matrix: one column per target cell plus one column per piece.
+
+    Pieces of the same shape are searched in a fixed order, so each tiling comes up once however
+    many copies a card has; pieces listed in `fixed` are left out of that, as callers pin them by index.
+    """
+    w, h = dimensions
+    rows = placements(dimensions, tetraminos)
+    if sum(len(tetramino[0]) for tetramino in tetraminos) != w * h:
+        return rows, None
+    matrix = [[y * w + x for x, y in cells] + [w * h + index] for index, cells in rows]
+    links = DancingLinks(w * h + len(tetraminos), matrix)
+    groups = twin_groups(tetraminos, fixed)
+    if groups:
+        links.order_twins([[w * h + index for index in group] for group in groups])
+    links.prune = dead_regions(w, h, [len(tetramino[0]) for tetramino in tetraminos])
+    return rows, links
+
+
+def twin_groups(tetraminos, fixed: Iterable[int] = ()) -> List[List[int]]:
+    """Indexes of the pieces that share a shape up to rotation, one list per shape with two or more pieces."""
+    fixed = set(fixed)
+    groups: Dict[frozenset, List[int]] = {}
+    for index, tetramino in enumerate(tetraminos):
+        if index not in fixed:
+            key = frozenset(orientation.cells for orientation in orientation_table(tetramino[0]))
+            groups.setdefault(key, []).append(index)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def dead_regions(w: int, h: int, piece_sizes: List[int]):
+    """Builds a DancingLinks.prune check that fails a branch as soon as a pocket of uncovered cells
+    cannot be filled exactly by the pieces still unplaced, or returns None when it cannot pay off.
+
+    A pocket smaller than every piece already has a cell with no rows left, which the search's
+    column choice finds on its own; the check only earns its cost when the piece sizes leave
+    larger unfillable pocket sizes, such as 6 with pentominoes only.
+    """
+    if not has_gaps(piece_sizes):
+        return None
+    n_cells = w * h
+    stride = w + 1
+    # Bit of each cell column in a board mask padded with a clear column on the right
+    cell_bits = [1 << (i // w * stride + i % w) for i in range(n_cells)]
+
+    def dead(links: DancingLinks) -> bool:
+        open_mask = 0
+        remaining = []
+        right = links.right
+        col = right[0]
+        while col:
+            if col <= n_cells:
+                open_mask |= cell_bits[col - 1]
+            else:
+                remaining.append(piece_sizes[col - 1 - n_cells])
+            col = right[col]
+        # Twin piece columns are off the header list; the unplaced ones are still to come
+        remaining.extend(piece_sizes[col - 1 - n_cells] for col in links.twins if not links.placed[col])
+        reachable = formable_sizes(remaining)
+        return any(not reachable >> pocket & 1 for pocket in mask_pocket_sizes(open_mask, stride))
+
+    return dead
+
+
+def _tiling(rows: List[Placement], chosen: List[int], n_pieces: int) -> List[List[Cell]]:
+    solution = [[] for _ in range(n_pieces)]
+    for row_index in chosen:
+        index, cells = rows[row_index]
+        solution[index] = list(cells)
+    return solution
+
+
+def solutions(dimensions: Tuple[int, int], tetraminos) -> Iterator[List[List[Cell]]]:
+    """Yields tilings of the target area as one list of cells per piece, in card order."""
+    rows, links = exact_cover(dimensions, tetraminos)
+    if links is None:
+        return
+    for chosen in links.search():
+        yield _tiling(rows, chosen, len(tetraminos))
+
+
+def solve(dimensions: Tuple[int, int], tetraminos) -> Optional[List[List[Cell]]]:
+    """Returns the first tiling found, or None when the card cannot be solved."""
+    return next(solutions(dimensions, tetraminos), None)
+
+
+def count_solutions(dimensions: Tuple[int, int], tetraminos, limit: Optional[int] = None) -> int:
+    """Counts tilings, stopping early once `limit` is reached. Tilings that only swap pieces of the same
+    shape count once."""
+    count = 0
+    for _ in solutions(dimensions, tetraminos):
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    return count
+
+
+def solve_partial(dimensions: Tuple[int, int], tetraminos, placed: Dict[int, Iterable[Cell]]) -> Optional[List[List[Cell]]]:
+    """Completes a layout in progress: returns a tiling that keeps every piece in `placed` (piece index to
+    cells) where it is, or None when the placed pieces overlap, stick out, or leave no way to finish."""
+    rows, links = exact_cover(dimensions, tetraminos, fixed=placed)
+    if links is None:
+        return None
+    row_of = {(index, frozenset(cells)): row_index for row_index, (index, cells) in enumerate(rows)}
+    chosen = []
+    used = set()
+    for index, cells in placed.items():
+        cells = frozenset(tuple(cell[:2]) for cell in cells)
+        row_index = row_of.get((index, cells))
+        if row_index is None or used & cells:
+            return None
+        used |= cells
+        links.select(row_index)
+        chosen.append(row_index)
+    rest = next(links.search(), None)
+    if rest is None:
+        return None
+    return _tiling(rows, chosen + rest, len(tetraminos))
+
+
+# Per-process state of the parallel search, set up by _init_worker
+_worker_card = None
+_worker_stop = None
+
+
+def _init_worker(dimensions: Tuple[int, int], tetraminos, stop) -> None:
+    global _worker_card, _worker_stop
+    _worker_card = (dimensions, tetraminos)
+    _worker_stop = stop
+
+
+def _search_branch(task: Tuple[List[int], bool]):
+    """Solves one subtree: replays the branch prefix, then returns its first cover or its cover count."""
+    prefix, count = task
+    if _worker_stop.value:
+        return 0 if count else None
+    _, links = exact_cover(*_worker_card)
+    links.abort = lambda: _worker_stop.value
+    for row_index in prefix:
+        links.select(row_index)
+    if count:
+        return sum(1 for _ in links.search())
+    for chosen in links.search(list(prefix)):
+        return chosen
+    return None
+
+
+def _split(links: DancingLinks, branches: int, max_depth: int = 4) -> List[List[int]]:
+    """Deepens the split until there are at least `branches` subtrees to hand out."""
+    prefixes = [[]]
+    for depth in range(1, max_depth + 1):
+        prefixes = list(links.branches(depth))
+        if len(prefixes) >= branches:
+            break
+    return prefixes
+
+
+def _run_parallel(dimensions: Tuple[int, int], tetraminos, count: bool, processes: Optional[int]):
+    # Imported here so the serial solver, and the pool workers themselves, load without it
+    import multiprocessing
+    rows, links = exact_cover(dimensions, tetraminos)
+    if links is None:
+        return rows, 0 if count else None
+    processes = processes or os.cpu_count() or 1
+    tasks = [(prefix, count) for prefix in _split(links, processes * 8)]
+    stop = multiprocessing.Value('b', 0, lock=False)
+    pool = multiprocessing.Pool(processes, _init_worker, (dimensions, tetraminos, stop))
+    try:
+        if count:
+            return rows, sum(pool.imap_unordered(_search_branch, tasks))
+        for chosen in pool.imap_unordered(_search_branch, tasks):
+            if chosen is not None:
+                stop.value = 1
+                return rows, chosen
+        return rows, None
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def solve_parallel(dimensions: Tuple[int, int], tetraminos, processes: Optional[int] = None) -> Optional[List[List[Cell]]]:
+    """Like solve(), but searches the top branches of the tree on a process pool and stops at the first tiling."""
+    rows, chosen = _run_parallel(dimensions, tetraminos, False, processes)
+    if chosen is None:
+        return None
+    return _tiling(rows, chosen, len(tetraminos))
+
+
+def count_solutions_parallel(dimensions: Tuple[int, int], tetraminos, processes: Optional[int] = None) -> int:
+    """Counts tilings like count_solutions, adding up the counts of the subtrees searched by each worker."""
+    return _run_parallel(dimensions, tetraminos, True, processes)[1]
@@ -1,142 +1,192 @@
-import tkinter as tk
+import argparse
 import sys
-
+from core import (check_dead_end, check_move, check_win, create_grid, import_card, place_tetraminos,
+                  remove_tetraminos)
+from piece import Piece
+from regions import EmptyRegions
+from profiling import profiler
+import zobrist
+
+# tkinter and the Tk window, both set up by main() so the module can be imported without a display
+tk = None
+root = None
 # Define grid as a global variable
 grid = None
 file_path = None  # Initialize file_path variable
 # Initialize current_piece and tetraminos_index as global variables
 current_piece = None
 tetraminos_index = 0
-
-def import_card(file_path):
-    dimensions = None
-    tetraminos = []
-
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
-        # Extract dimensions from the first line
-        dimensions = tuple(map(int, lines[0].strip().split(',')))
-
-        # Process Tetraminos data
-        for line in lines[1:]:
-            data = line.strip().split(';;')
-
-            # Parsing coordinates
-            coordinates = []
-            for coord in data[0].split(';'):
-                coord = coord.strip()
-                if coord:
-                    coord = tuple(map(int, coord[1:-1].split(',')))
-                    coordinates.append(coord)
-
-            # Parsing color
-            color = tuple(map(int, data[1].split(';')[1].split(',')))
-            tetraminos.append([coordinates, color])
-
-    return dimensions, tetraminos
-
-
-
-# Function to initialize game grid
-def create_grid(w, h):
-    grid = [[' ' for _ in range(3 * w + 2)] for _ in range(3 * h + 2)]
-    return grid
+# Empty-cell count and pockets of the grid, kept in step with every place and remove
+regions = None
+dead_end = False
+# Card size and the background hint solver for the loaded card
+dimensions = None
+hints = None
+# Zobrist keys of the card's target area (one layer per piece) and the hash of the pieces inside it
+piece_keys = None
+state_hash = 0
+# Label widgets shown by update_display, and the grid values they currently display
+labels = []
+shown = [[]]
 
 # Function to update the display with the current game state
-def update_display(grid):
-    for widget in root.winfo_children():
-        widget.destroy()
-    for i in range(len(grid)):
-        for j in range(len(grid[0])):
-            label = tk.Label(root, text=grid[i][j], borderwidth=1, relief="solid", width=3, height=2)
-            label.grid(row=i, column=j)
-
-# Function to place Tetraminos on the grid
-def place_tetraminos(grid, current_piece):
-    for pos in current_piece[0]:
-        x, y = pos
-        grid[y][x] = current_piece[1]
-    return grid
-
-# Function to check if the current Tetramino position is valid
-def check_move(tetramino, grid):
-    for pos in tetramino[0]:
-        x, y = pos
-        if x < 0 or y < 0 or x >= len(grid[0]) or y >= len(grid):
-            return False
-        if grid[y][x] != ' ':
-            return False
-    return True
-
-# Function to rotate Tetraminos
-def rotate_tetramino(tetramino, clockwise=True):
-    new_positions = []
-    for x, y in tetramino[0]:
-        if clockwise:
-            new_positions.append((-y, x))
-        else:
-            new_positions.append((y, -x))
-    tetramino[0] = new_positions
-    return tetramino
-
-# Function to check for a win condition
-def check_win(grid):
-    for row in grid:
-        if ' ' in row:
-            return False
-    return True
+# Only the given (x, y) cells are refreshed; the label grid is built once and reused
+def update_display(grid, cells=None):
+    global labels, shown
+    if len(shown) != len(grid) or len(shown[0]) != len(grid[0]):
+        for widget in root.winfo_children():
+            widget.destroy()
+        labels = []
+        shown = [row.copy() for row in grid]
+        for i in range(len(grid)):
+            labels.append([])
+            for j in range(len(grid[0])):
+                label = tk.Label(root, text=grid[i][j], borderwidth=1, relief="solid", width=3, height=2)
+                label.grid(row=i, column=j)
+                labels[i].append(label)
+        return
+    if cells is None:
+        cells = [(j, i) for i in range(len(grid)) for j in range(len(grid[0]))]
+    for x, y in cells:
+        if 0 <= y < len(grid) and 0 <= x < len(grid[0]) and shown[y][x] != grid[y][x]:
+            shown[y][x] = grid[y][x]
+            labels[y][x].configure(text=grid[y][x])
+
+# Function to list the pieces lying inside the card's target area, by card index
+def placed_pieces():
+    w, h = dimensions
+    if all(0 <= x < w and 0 <= y < h for x, y in current_piece[0]):
+        return {tetraminos_index: current_piece[0]}
+    return {}
+
+# Function to list the card's pieces not yet inside the target area
+def unplaced_pieces(placed):
+    return [piece for index, piece in enumerate(tetraminos) if index not in placed]
+
+# Function to fold a piece's cells in or out of the state hash; XOR makes both the same operation
+def toggle_hash(piece, index):
+    global state_hash
+    state_hash ^= zobrist.cells_hash(piece_keys[index], piece[0])
+
+# Function to show a hint once the background solver has answered, without blocking the Tk loop
+def show_hint(future):
+    if not future.done():
+        root.after(50, show_hint, future)
+        return
+    hint = future.result()
+    if not hint.solvable:
+        print("Hint: the pieces placed so far cannot be completed.")
+    elif hint.piece is None:
+        print("Hint: every piece is placed.")
+    else:
+        print(f"Hint: piece {hint.piece + 1} goes on {list(hint.cells)}")
 
 # Function to handle user inputs
 def handle_input(event):
-    global grid, current_piece, tetraminos_index
+    global grid, current_piece, dead_end
     key = event.keysym
+    if not current_piece:
+        return
+    if key in ('h', 'H'):
+        placed = placed_pieces()
+        # Cells outside the target area are not hashed, so the live hash only matches a fully placed piece
+        show_hint(hints.request(placed, state_hash if placed else None))
+        return
     if key == 'Right':
-        if current_piece:
-            temp_piece = [(pos[0] + 1, pos[1]) for pos in current_piece[0]]
-            if check_move((temp_piece, current_piece[1]), grid):
-                current_piece = (temp_piece, current_piece[1])
-                grid = place_tetraminos(grid, current_piece)
+        moved_piece = current_piece.moved(1, 0)
     elif key == 'Left':
-        if current_piece:
-            temp_piece = [(pos[0] - 1, pos[1]) for pos in current_piece[0]]
-            if check_move((temp_piece, current_piece[1]), grid):
-                current_piece = (temp_piece, current_piece[1])
-                grid = place_tetraminos(grid, current_piece)
+        moved_piece = current_piece.moved(-1, 0)
     elif key == 'Up':
-        if current_piece:
-            rotated_piece = rotate_tetramino(current_piece, clockwise=True)
-            if check_move(rotated_piece, grid):
-                current_piece = rotated_piece
-                grid = place_tetraminos(grid, current_piece)
+        moved_piece = current_piece.rotated(clockwise=True)
     elif key == 'Down':
-        if current_piece:
-            temp_piece = [(pos[0], pos[1] + 1) for pos in current_piece[0]]
-            if check_move((temp_piece, current_piece[1]), grid):
-                current_piece = (temp_piece, current_piece[1])
-                grid = place_tetraminos(grid, current_piece)
-    update_display(grid)
-    if check_win(grid):
+        moved_piece = current_piece.moved(0, 1)
+    else:
+        return
+    # Lift the piece first so it does not collide with its own cells
+    old_cells = current_piece[0]
+    old_placed = placed_pieces()
+    grid = remove_tetraminos(grid, current_piece)
+    toggle_hash(current_piece, tetraminos_index)
+    if check_move(moved_piece, grid):
+        current_piece = moved_piece
+    grid = place_tetraminos(grid, current_piece)
+    toggle_hash(current_piece, tetraminos_index)
+    # The regions index only covers the target area, so it only changes when a piece inside it moves
+    placed = placed_pieces()
+    if placed != old_placed:
+        for cells in old_placed.values():
+            regions.clear(cells)
+        for cells in placed.values():
+            regions.fill(cells)
+    if zobrist.DEBUG:
+        zobrist.verify("handle_input", state_hash, zobrist.cells_hash(piece_keys[tetraminos_index], current_piece[0]))
+    update_display(grid, set(old_cells) | set(current_piece[0]))
+    if check_win(grid, dimensions, regions):
         print("Congratulations! You won!")
+        return
+    # Only report the change, not every key press made while stuck
+    stuck = check_dead_end(regions, unplaced_pieces(placed))
+    if stuck and not dead_end:
+        print("No remaining pieces fit one of the empty pockets; this layout cannot be completed.")
+    dead_end = stuck
 
 # Function to start the game
 def start_game(file_path):
-    global grid, tetraminos, tetraminos_index, current_piece
+    global grid, tetraminos, tetraminos_index, current_piece, regions, dead_end, dimensions, hints, piece_keys, state_hash
+    # Imported here so that importing t.py does not load the process pool machinery
+    from hints import HintEngine
     dimensions, tetraminos = import_card(file_path)
+    hints = HintEngine(dimensions, tetraminos)
+    piece_keys = zobrist.cell_keys(dimensions[0], dimensions[1], len(tetraminos))
+    state_hash = 0
     grid = create_grid(dimensions[0], dimensions[1])
     tetraminos_index = 0
-    current_piece = tetraminos[tetraminos_index]
+    current_piece = Piece.from_cells(*tetraminos[tetraminos_index])
     update_display(place_tetraminos(grid, current_piece))
+    toggle_hash(current_piece, tetraminos_index)
+    # Indexes the w×h target area only, the same cells placed_pieces() and piece_keys cover
+    placed = placed_pieces()
+    regions = EmptyRegions(dimensions[0], dimensions[1], (cell for cells in placed.values() for cell in cells))
+    dead_end = check_dead_end(regions, unplaced_pieces(placed))
+    if dead_end:
+        print("The pieces of this card cannot fill the grid.")
     root.bind("<Key>", handle_input)
-    print("Game is starting...")
-
-root = tk.Tk()
-root.title("Tetramino Game")
-
-if len(sys.argv) < 2:
-    print("Please provide the game file path as an argument.")
-else:
-    file_path = sys.argv[1]
+    print("Game is starting... (press H for a hint)")
+
+# Function to time the input and display paths; must run before start_game binds handle_input
+def profile_hot_paths():
+    profiler.instrument(sys.modules[__name__], {
+        "handle_input": "handle_input",
+        "update_display": "update_display",
+        "check_move": "check_move",
+        "check_win": "check_win",
+    })
+
+# Function to open the window and run the game given on the command line
+def main():
+    global tk, root, file_path
+    parser = argparse.ArgumentParser(description="Tetramino card puzzle")
+    parser.add_argument("card", help="card file to play")
+    parser.add_argument("--profile", nargs="?", const="t_trace.json", metavar="PATH",
+                        help="time the hot paths and write a Chrome trace on exit (default t_trace.json)")
+    args = parser.parse_args()
+    if args.profile:
+        profile_hot_paths()
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.title("Tetramino Game")
+
+    file_path = args.card
     start_game(file_path)
 
-root.mainloop()
+    root.mainloop()
+    if hints is not None:
+        hints.close()
+    if args.profile:
+        profiler.write_chrome_trace(args.profile)
+        print(profiler.report())
+        print(f"trace written to {args.profile}")
+
+if __name__ == "__main__":
+    main()
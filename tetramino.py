@@ -1,104 +1,256 @@
-import tkinter as tk
+import argparse
 import random
+from board import Board
+from engine import DOWN, DROP, LEFT, RIGHT, ROTATE, SHAPES
+from gameloop import FixedStepLoop, gravity_interval
+from profiling import profiler
+from replay import MAX_SEED, Recorder, load
+from shapes import orientation_table, shape_cells
+from zobrist import piece_key
 
 class Tetris:
-    def __init__(self, master, width=10, height=20, block_size=30):
+    def __init__(self, master, width=10, height=20, block_size=30, bot=None, seed=None, replay=None):
         self.master = master
+        # Optional bot.Bot that places each new piece
+        self.bot = bot
+        # Optional replay.Replay whose actions are played instead of reading the keyboard
+        self.replay = replay
+        self.replay_index = 0
+        if replay is not None:
+            width, height, seed = replay.width, replay.height, replay.seed
+        # Every game gets its own seeded generator so it can be recorded and replayed exactly
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.random = random.Random(self.seed)
+        self.recorder = Recorder(self.seed, width, height)
+        self.actions = {LEFT: self.move_left, RIGHT: self.move_right, ROTATE: self.rotate,
+                        DOWN: self.move_down, DROP: self.hard_drop}
+        self.game_over = False
         self.width = width
         self.height = height
         self.block_size = block_size
         self.canvas_size = block_size
+        # Imported here so the module, and the engine it shares, load without a display
+        import tkinter as tk
         self.canvas = tk.Canvas(master, width=width * block_size, height=height * block_size, bg="white")
         self.canvas.pack()
-        self.shapes = [
-            [[1, 1, 1, 1]],
-            [[1, 1, 1], [1]],
-            [[1, 1, 1], [0, 0, 1]],
-            [[1, 1, 1], [0, 1]],
-            [[1, 1], [1, 1]],
-            [[1, 1, 1], [0, 1, 0]],
-            [[1, 1, 1], [1, 0]],
-        ]
+        self.board = Board(width, height)
+        self.shapes = SHAPES
         self.current_shape = {"shape": [], "color": ""}
+        # Rectangles reused for the falling piece; spare ones are parked off the canvas
+        self.parked = (-2 * block_size, -2 * block_size, -block_size, -block_size)
+        self.shape_items = [
+            self.canvas.create_rectangle(*self.parked, tags="current_shape")
+            for _ in range(max(len(shape_cells(shape)) for shape in self.shapes))
+        ]
+        self.lines = 0
+        self.level = 0
         self.new_shape()
-        self.master.after(500, self.update)
-        self.master.bind("<Left>", lambda event: self.move_left())
-        self.master.bind("<Right>", lambda event: self.move_right())
-        self.master.bind("<Up>", lambda event: self.rotate())
-        self.master.bind("<Down>", lambda event: self.move_down())
+        # Keys are queued and applied at the start of the next frame; gravity ticks on its own clock
+        self.loop = FixedStepLoop(master, self.update, interval=lambda: gravity_interval(self.level))
+        if replay is None:
+            self.master.bind("<Left>", lambda event: self.loop.submit(lambda: self.act(LEFT)))
+            self.master.bind("<Right>", lambda event: self.loop.submit(lambda: self.act(RIGHT)))
+            self.master.bind("<Up>", lambda event: self.loop.submit(lambda: self.act(ROTATE)))
+            self.master.bind("<Down>", lambda event: self.loop.submit(lambda: self.act(DOWN)))
+            self.master.bind("<space>", lambda event: self.loop.submit(lambda: self.act(DROP)))
+        self.loop.start()
 
     def new_shape(self):
-        self.current_shape["shape"] = random.choice(self.shapes)
-        self.current_shape["color"] = "#{:06x}".format(random.randint(0, 0xFFFFFF))
-        self.current_x = self.width // 2 - len(self.current_shape["shape"][0]) // 2
+        self.current_shape["shape"] = self.random.choice(self.shapes)
+        self.current_shape["color"] = "#{:06x}".format(self.random.randint(0, 0xFFFFFF))
+        self.current_shape["index"] = self.shapes.index(self.current_shape["shape"])
+        self.current_shape["orientations"] = orientation_table(shape_cells(self.current_shape["shape"]))
+        self.current_shape["rotation"] = 0
+        self.current_shape["orientation"] = self.current_shape["orientations"][0]
+        self.current_x = self.width // 2 - self.current_shape["orientation"].width // 2
         self.current_y = 0
+        self.canvas.itemconfigure("current_shape", fill=self.current_shape["color"])
+        if not self.is_valid_position(self.current_x, self.current_y, self.current_shape["orientation"]):
+            self.game_over = True
+            self.canvas.create_text(self.width * self.canvas_size // 2, self.height * self.canvas_size // 2,
+                                    text="Game over", font=("Helvetica", 20, "bold"))
+            return
+        if self.bot is not None:
+            self.apply_bot()
         self.draw_shape()
 
+    def apply_bot(self):
+        """Turns and shifts the new piece to the bot's chosen placement; gravity then drops it.
+
+        The moves go through act() like key presses, so bot games record and replay too.
+        """
+        placement = self.bot.best_placement(self.board, self.current_shape["orientations"])
+        if placement is None:
+            return
+        for _ in range(placement.rotation):
+            self.act(ROTATE)
+        shift = LEFT if placement.x < self.current_x else RIGHT
+        for _ in range(abs(placement.x - self.current_x)):
+            self.act(shift)
+
+    def act(self, action):
+        """Applies and records one player action."""
+        if self.game_over:
+            return
+        self.recorder.action(action)
+        self.actions[action]()
+
     def draw_shape(self):
-        self.canvas.delete("current_shape")
-        for i in range(len(self.current_shape["shape"])):
-            for j in range(len(self.current_shape["shape"][i])):
-                if self.current_shape["shape"][i][j]:
-                    x = (self.current_x + j) * self.canvas_size
-                    y = (self.current_y + i) * self.canvas_size
-                    self.canvas.create_rectangle(
-                        x, y, x + self.canvas_size, y + self.canvas_size, fill=self.current_shape["color"], tags="current_shape"
-                    )
+        cells = self.current_shape["orientation"].cells
+        for index, item in enumerate(self.shape_items):
+            if index < len(cells):
+                j, i = cells[index]
+                x = (self.current_x + j) * self.canvas_size
+                y = (self.current_y + i) * self.canvas_size
+                self.canvas.coords(item, x, y, x + self.canvas_size, y + self.canvas_size)
+            else:
+                self.canvas.coords(item, *self.parked)
+
+    def lock_shape(self):
+        self.board.lock(self.current_shape["orientation"].masks, self.current_x, self.current_y)
+        for j, i in self.current_shape["orientation"].cells:
+            x = (self.current_x + j) * self.canvas_size
+            y = (self.current_y + i) * self.canvas_size
+            self.canvas.create_rectangle(
+                x, y, x + self.canvas_size, y + self.canvas_size, fill=self.current_shape["color"], tags="locked"
+            )
+        for item in self.shape_items:
+            self.canvas.coords(item, *self.parked)
 
     def clear_lines(self):
-        lines_to_clear = []
-        for i in range(self.current_y, self.current_y + len(self.current_shape["shape"])):
-            if all(self.canvas.itemcget(item, "fill") != "" for item in self.canvas.find_enclosed(0, i * self.canvas_size, self.width * self.canvas_size, (i + 1) * self.canvas_size)):
-                lines_to_clear.append(i)
+        lines_to_clear = self.board.full_rows(range(self.current_y, self.current_y + self.current_shape["orientation"].height))
+        self.board.clear_rows(lines_to_clear)
+        self.lines += len(lines_to_clear)
+        self.level = self.lines // 10
 
+        if not lines_to_clear:
+            return
         for line in lines_to_clear:
-            for item in self.canvas.find_enclosed(0, 0, self.width * self.canvas_size, line * self.canvas_size):
-                self.canvas.move(item, 0, self.canvas_size)
+            self.canvas.addtag_enclosed("cleared", *self.rows_region(line, line + 1))
+        self.canvas.delete("cleared")
+        # Each band of rows between two cleared lines drops by the number of cleared lines below it,
+        # moved as one tagged block; bands are shifted bottom-up so they never overlap the next query
+        bounds = [-1] + lines_to_clear
+        for k in range(len(lines_to_clear), 0, -1):
+            top, bottom = bounds[k - 1] + 1, bounds[k]
+            if top < bottom:
+                self.canvas.addtag_enclosed("falling", *self.rows_region(top, bottom))
+                self.canvas.move("falling", 0, (len(lines_to_clear) - k + 1) * self.canvas_size)
+                self.canvas.dtag("falling")
+
+    def rows_region(self, top, bottom):
+        """Canvas box enclosing the blocks of rows top..bottom-1, with half a block of slack for outlines."""
+        half = self.canvas_size // 2
+        return -half, top * self.canvas_size - half, self.width * self.canvas_size + half, bottom * self.canvas_size + half
 
     def move_left(self):
-        if self.is_valid_position(self.current_x - 1, self.current_y, self.current_shape["shape"]):
+        if self.is_valid_position(self.current_x - 1, self.current_y, self.current_shape["orientation"]):
             self.current_x -= 1
             self.draw_shape()
 
     def move_right(self):
-        if self.is_valid_position(self.current_x + 1, self.current_y, self.current_shape["shape"]):
+        if self.is_valid_position(self.current_x + 1, self.current_y, self.current_shape["orientation"]):
             self.current_x += 1
             self.draw_shape()
 
     def move_down(self):
-        if self.is_valid_position(self.current_x, self.current_y + 1, self.current_shape["shape"]):
+        if self.is_valid_position(self.current_x, self.current_y + 1, self.current_shape["orientation"]):
             self.current_y += 1
             self.draw_shape()
         else:
+            self.lock_shape()
             self.clear_lines()
             self.new_shape()
 
+    def hard_drop(self):
+        while self.is_valid_position(self.current_x, self.current_y + 1, self.current_shape["orientation"]):
+            self.current_y += 1
+        self.move_down()
+
     def rotate(self):
-        rotated_shape = [list(row) for row in zip(*self.current_shape["shape"][::-1])]
-        if self.is_valid_position(self.current_x, self.current_y, rotated_shape):
-            self.current_shape["shape"] = rotated_shape
+        rotation = (self.current_shape["rotation"] + 1) % len(self.current_shape["orientations"])
+        rotated = self.current_shape["orientations"][rotation]
+        if self.is_valid_position(self.current_x, self.current_y, rotated):
+            self.current_shape["rotation"] = rotation
+            self.current_shape["orientation"] = rotated
             self.draw_shape()
 
-    def is_valid_position(self, x, y, shape):
-        for i in range(len(shape)):
-            for j in range(len(shape[i])):
-                if shape[i][j]:
-                    x_pos = x + j
-                    y_pos = y + i
-                    if (
-                        x_pos < 0 or x_pos >= self.width or
-                        y_pos >= self.height or
-                        (y_pos >= 0 and x_pos >= 0 and self.canvas.itemcget(self.canvas.find_overlapping(x_pos * self.canvas_size, y_pos * self.canvas_size, (x_pos + 1) * self.canvas_size, (y_pos + 1) * self.canvas_size)[0], "fill") != "")
-                    ):
-                        return False
-        return True
+    def state_hash(self):
+        """Zobrist hash of the locked cells plus the falling piece, without walking the board or the canvas."""
+        return self.board.hash ^ piece_key(self.current_shape["index"], self.current_shape["rotation"],
+                                           self.current_x, self.current_y)
+
+    def is_valid_position(self, x, y, orientation):
+        return self.board.is_valid_position(orientation.masks, x, y)
 
     def update(self):
+        if self.replay is not None:
+            self.play_events()
+        if self.game_over:
+            self.loop.stop()
+            return
+        self.recorder.tick()
         self.move_down()
-        self.master.after(500, self.update)
+
+    def play_events(self):
+        """Applies the replay actions due before the next gravity tick, and stops at the end of the replay."""
+        events = self.replay.events
+        while self.replay_index < len(events) and events[self.replay_index][0] <= self.recorder.ticks:
+            self.act(events[self.replay_index][1])
+            self.replay_index += 1
+        if self.replay_index == len(events) and self.recorder.ticks >= self.replay.ticks:
+            self.game_over = True
+
+def profile_hot_paths():
+    """Times the tick, input, collision, line clear and drawing paths; call before creating a Tetris."""
+    profiler.instrument(Tetris, {
+        "update": "tick",
+        "act": "input",
+        "is_valid_position": "collision",
+        "clear_lines": "clear_lines",
+        "draw_shape": "render.draw_shape",
+        "lock_shape": "render.lock_shape",
+    })
+    profiler.instrument(FixedStepLoop, {"frame": "frame"})
+
+def seed_value(text):
+    seed = int(text)
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {MAX_SEED}")
+    return seed
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tetris")
+    parser.add_argument("--bot", action="store_true", help="let the bot place the pieces")
+    parser.add_argument("--seed", type=seed_value, default=None, help="seed for the piece sequence")
+    parser.add_argument("--record", metavar="PATH", help="save a replay of the game on exit")
+    parser.add_argument("--replay", metavar="PATH", help="play back a saved replay instead of reading the keyboard")
+    parser.add_argument("--speed", type=float, default=1.0, help="gravity speed-up factor")
+    parser.add_argument("--profile", metavar="PATH", help="time the hot paths and write a Chrome trace on exit")
+    args = parser.parse_args()
+    if args.profile:
+        profile_hot_paths()
+    import tkinter as tk
     root = tk.Tk()
     root.title("Tetris")
-    game = Tetris(root)
+    bot = None
+    if args.bot and not args.replay:
+        # Imported here so the game itself does not need NumPy
+        from bot import Bot
+        bot = Bot()
+    game = Tetris(root, bot=bot, seed=args.seed, replay=load(args.replay) if args.replay else None)
+    if args.speed != 1.0:
+        game.loop.interval = lambda: gravity_interval(game.level) / args.speed
+    if args.profile:
+        # Show Tk's paint as its own span in the trace
+        game.loop.redraw = profiler.wrap(game.loop.redraw, "render.tk")
     root.mainloop()
+    if args.profile:
+        profiler.write_chrome_trace(args.profile)
+        print(profiler.report())
+        print(f"trace written to {args.profile}")
+    if args.record:
+        game.recorder.save(args.record, game.lines)
+        print(f"replay saved to {args.record} (seed {game.seed})")
+    for name, summary in game.loop.report().items():
+        print(name, " ".join(f"{key}={value:.2f}ms" for key, value in summary.items()))
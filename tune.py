@@ -0,0 +1,219 @@
+"""Tunes the bot's evaluation weights with the cross-entropy method.
+
+    python tune.py                          # 20 generations, checkpointing to tune_checkpoint.json
+    python tune.py --generations 50 --games 200 --workers 32
+    python tune.py --fresh                  # ignore an existing checkpoint
+
+Each generation samples a population of weight vectors from a diagonal Gaussian, plays the
+same set of seeded headless games with every candidate on a process pool, and refits the
+Gaussian to the best candidates. Workers return only summary numbers, never game objects.
+The state is written after every generation, so an interrupted run picks up where it stopped;
+it keeps the population, elite, games, piece limit and seed it was started with.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from bot import DEFAULT_WEIGHTS, play_game
+
+FEATURES = ("height", "lines", "holes", "bumpiness")
+
+
+class Stats(NamedTuple):
+    """Summary of a batch of games played with one weight vector."""
+    games: int
+    lines: int
+    pieces: int
+    min_lines: int
+
+    def merge(self, other: "Stats") -> "Stats":
+        return Stats(self.games + other.games, self.lines + other.lines, self.pieces + other.pieces,
+                     min(self.min_lines, other.min_lines))
+
+    @property
+    def mean_lines(self) -> float:
+        return self.lines / self.games if self.games else 0.0
+
+
+def evaluate(weights: Sequence[float], seeds: Sequence[int], max_pieces: int) -> Stats:
+    """Plays one game per seed and returns their totals. Runs in the worker processes."""
+    lines = []
+    pieces = 0
+    for seed in seeds:
+        game = play_game(seed, weights, max_pieces)
+        lines.append(game.lines_cleared)
+        pieces += game.pieces
+    return Stats(len(lines), sum(lines), pieces, min(lines))
+
+
+def _chunks(seeds: List[int], size: int) -> List[List[int]]:
+    return [seeds[i:i + size] for i in range(0, len(seeds), size)]
+
+
+class CrossEntropyTuner:
+    """Cross-entropy search over weight vectors, with its whole state in a JSON-friendly dict."""
+
+    def __init__(self, population: int = 32, elite: float = 0.25, games: int = 50, max_pieces: int = 500,
+                 initial_std: float = 0.5, noise: float = 0.05, seed: int = 0):
+        self.population = population
+        self.elite = max(1, int(population * elite))
+        self.games = games
+        self.max_pieces = max_pieces
+        self.noise = noise
+        self.seed = seed
+        self.generation = 0
+        self.mean = list(DEFAULT_WEIGHTS)
+        self.std = [initial_std] * len(DEFAULT_WEIGHTS)
+        self.best: Optional[Dict] = None
+        self.history: List[Dict] = []
+
+    def state(self) -> Dict:
+        return {
+            "population": self.population, "elite": self.elite, "games": self.games,
+            "max_pieces": self.max_pieces, "noise": self.noise, "seed": self.seed,
+            "generation": self.generation, "mean": self.mean, "std": self.std,
+            "best": self.best, "history": self.history,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "CrossEntropyTuner":
+        tuner = cls()
+        for key, value in state.items():
+            setattr(tuner, key, value)
+        return tuner
+
+    def sample(self) -> List[List[float]]:
+        # Seeded per generation so a resumed run draws the same candidates it would have
+        rng = random.Random(self.seed * 1000003 + self.generation)
+        return [[rng.gauss(mean, std) for mean, std in zip(self.mean, self.std)] for _ in range(self.population)]
+
+    def seeds(self) -> List[int]:
+        # Every candidate in a generation plays the same games, so scores differ only by the weights
+        start = (self.seed * 1000003 + self.generation) * self.games
+        return list(range(start, start + self.games))
+
+    def update(self, candidates: List[List[float]], results: List[Stats]) -> Dict:
+        ranked = sorted(zip(candidates, results), key=lambda pair: pair[1].mean_lines, reverse=True)
+        elite = [weights for weights, _ in ranked[:self.elite]]
+        columns = list(zip(*elite))
+        self.mean = [sum(column) / len(column) for column in columns]
+        # Extra noise keeps the search from collapsing onto the first good region it finds
+        self.std = [math.sqrt(sum((value - mean) ** 2 for value in column) / len(column)) + self.noise
+                    for column, mean in zip(columns, self.mean)]
+        top_weights, top = ranked[0]
+        summary = {
+            "generation": self.generation,
+            "best_lines": top.mean_lines,
+            "elite_lines": sum(stats.mean_lines for _, stats in ranked[:self.elite]) / self.elite,
+            "mean": self.mean,
+        }
+        if self.best is None or top.mean_lines > self.best["lines"]:
+            self.best = {"weights": top_weights, "lines": top.mean_lines, "min_lines": top.min_lines,
+                         "generation": self.generation}
+        self.history.append(summary)
+        self.generation += 1
+        return summary
+
+    def run_generation(self, executor: ProcessPoolExecutor, chunk: int) -> Dict:
+        candidates = self.sample()
+        batches = _chunks(self.seeds(), chunk)
+        futures = [[executor.submit(evaluate, weights, seeds, self.max_pieces) for seeds in batches]
+                   for weights in candidates]
+        results = []
+        for batch in futures:
+            stats = batch[0].result()
+            for future in batch[1:]:
+                stats = stats.merge(future.result())
+            results.append(stats)
+        return self.update(candidates, results)
+
+
+def save_checkpoint(path: str, tuner: CrossEntropyTuner) -> None:
+    """Writes the tuner state through a temporary file so a crash never leaves half a checkpoint."""
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump(tuner.state(), file, indent=2)
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path: str) -> Optional[CrossEntropyTuner]:
+    try:
+        with open(path) as file:
+            return CrossEntropyTuner.from_state(json.load(file))
+    except FileNotFoundError:
+        return None
+
+
+def checkpoint_conflicts(tuner: CrossEntropyTuner, settings: Dict) -> List[str]:
+    """The given settings a resumed tuner does not match, as the options it was started with."""
+    conflicts = []
+    for name, value in settings.items():
+        saved = getattr(tuner, name)
+        if name == "elite":
+            # The tuner keeps the elite as a count of candidates, not as the fraction given
+            value = max(1, int(tuner.population * value))
+        if value != saved:
+            conflicts.append(f"an elite of {saved}" if name == "elite" else f"--{name.replace('_', '-')} {saved}")
+    return conflicts
+
+
+def tune(tuner: CrossEntropyTuner, generations: int, checkpoint: Optional[str] = None,
+         workers: Optional[int] = None, chunk: int = 0) -> CrossEntropyTuner:
+    """Runs generations until `generations` have been completed in total, checkpointing after each."""
+    workers = workers or os.cpu_count() or 1
+    # Enough batches per candidate to keep every worker busy, but big enough to amortize the round trip
+    chunk = chunk or max(1, min(10, tuner.games * tuner.population // (workers * 4)))
+    with ProcessPoolExecutor(workers) as executor:
+        while tuner.generation < generations:
+            start = time.perf_counter()
+            summary = tuner.run_generation(executor, chunk)
+            elapsed = time.perf_counter() - start
+            weights = ", ".join(f"{name} {value:+.3f}" for name, value in zip(FEATURES, summary["mean"]))
+            print(f"generation {summary['generation']}: best {summary['best_lines']:.1f} lines, "
+                  f"elite {summary['elite_lines']:.1f}; mean [{weights}] "
+                  f"({tuner.population * tuner.games / elapsed:.0f} games/s)", flush=True)
+            if checkpoint:
+                save_checkpoint(checkpoint, tuner)
+    return tuner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the bot's evaluation weights on a process pool.")
+    parser.add_argument("--generations", type=int, default=20, help="total generations to reach")
+    # Left as None unless given, so a resumed run can tell an explicit setting from the default
+    parser.add_argument("--population", type=int, default=None, help="weight vectors per generation (default 32)")
+    parser.add_argument("--elite", type=float, default=None,
+                        help="fraction of candidates the next generation is fit to (default 0.25)")
+    parser.add_argument("--games", type=int, default=None, help="seeded games per candidate (default 50)")
+    parser.add_argument("--max-pieces", type=int, default=None, help="pieces after which a game is cut off (default 500)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=0, help="games per task (default: picked from the pool size)")
+    parser.add_argument("--checkpoint", default="tune_checkpoint.json", help="state file, resumed if it exists")
+    parser.add_argument("--fresh", action="store_true", help="start over even if the checkpoint exists")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the candidates and games (default 0)")
+    args = parser.parse_args(argv)
+    settings = {name: value for name, value in (("population", args.population), ("elite", args.elite),
+                                                ("games", args.games), ("max_pieces", args.max_pieces),
+                                                ("seed", args.seed)) if value is not None}
+
+    tuner = None if args.fresh else load_checkpoint(args.checkpoint)
+    if tuner is None:
+        tuner = CrossEntropyTuner(**settings)
+    else:
+        conflicts = checkpoint_conflicts(tuner, settings)
+        if conflicts:
+            parser.error(f"{args.checkpoint} was started with {', '.join(conflicts)}; "
+                         f"drop those options to resume it, or pass --fresh to start over")
+        print(f"resuming {args.checkpoint} at generation {tuner.generation}")
+    tune(tuner, args.generations, args.checkpoint, args.workers, args.chunk)
+    if tuner.best is not None:
+        print(f"best: {tuner.best['lines']:.1f} lines with weights {tuner.best['weights']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Checks every card in a directory tree on a process pool.
+
+    python validate.py packs/                  # syntax, bounds and cell count
+    python validate.py packs/ --solve 2        # also search for a tiling, at most 2 s per card
+
+Prints one line per card as results come in, then a summary; the exit status is 1 when any
+card is invalid or unsolvable. Cards are read straight from the text files, so validating
+never writes the binary cache next to them.
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+from typing import Iterator, List, Optional, Tuple
+
+from cards import Card, parse_card
+from shapes import normalize, orientation_table
+from solver import exact_cover
+
+OK, INVALID, SOLVABLE, UNSOLVABLE, TIMEOUT = "ok", "invalid", "solvable", "unsolvable", "timeout"
+# Statuses that fail the run
+FAILURES = (INVALID, UNSOLVABLE)
+
+Result = Tuple[str, str, str, float]
+
+
+def check_card(card: Card) -> Optional[str]:
+    """Returns what is wrong with a parsed card, or None when it is well formed."""
+    (w, h), tetraminos = card
+    if w <= 0 or h <= 0:
+        return f"bad dimensions {w}x{h}"
+    if not tetraminos:
+        return "no pieces"
+    for number, (cells, color) in enumerate(tetraminos, 1):
+        if len(set(cells)) != len(cells):
+            return f"piece {number} repeats a cell"
+        if not _connected(cells):
+            return f"piece {number} is not connected"
+        if not any(o.width <= w and o.height <= h for o in orientation_table(normalize(cells))):
+            return f"piece {number} does not fit in {w}x{h} in any rotation"
+        if not color:
+            return f"piece {number} has no color"
+    total = sum(len(cells) for cells, _ in tetraminos)
+    if total != w * h:
+        return f"pieces cover {total} cells, the card has {w * h}"
+    return None
+
+
+def _connected(cells) -> bool:
+    remaining = set(cells)
+    stack = [remaining.pop()]
+    while stack:
+        x, y = stack.pop()
+        for neighbour in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if neighbour in remaining:
+                remaining.remove(neighbour)
+                stack.append(neighbour)
+    return not remaining
+
+
+def solvable(card: Card, timeout: float) -> str:
+    """Searches for one tiling, giving up after `timeout` seconds through the solver's abort hook."""
+    _, links = exact_cover(*card)
+    if links is None:
+        return UNSOLVABLE
+    deadline = time.monotonic() + timeout
+    timed_out = []
+
+    def abort():
+        if time.monotonic() > deadline:
+            timed_out.append(True)
+        return bool(timed_out)
+
+    links.abort = abort
+    found = next(links.search(), None)
+    if found is not None:
+        return SOLVABLE
+    return TIMEOUT if timed_out else UNSOLVABLE
+
+
+def validate_file(task: Tuple[str, Optional[float]]) -> Result:
+    """Worker entry point: returns (path, status, detail, seconds)."""
+    path, timeout = task
+    start = time.perf_counter()
+    try:
+        with open(path, "r") as file:
+            card = parse_card(file)
+    except (OSError, UnicodeDecodeError, ValueError) as error:
+        return path, INVALID, str(error), time.perf_counter() - start
+    problem = check_card(card)
+    if problem is not None:
+        return path, INVALID, problem, time.perf_counter() - start
+    status = OK if timeout is None else solvable(card, timeout)
+    return path, status, "", time.perf_counter() - start
+
+
+def find_cards(directory: str, pattern: str) -> Iterator[str]:
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if fnmatch.fnmatch(name, pattern):
+                yield os.path.join(root, name)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate a directory of puzzle cards.")
+    parser.add_argument("directory")
+    parser.add_argument("--pattern", default="*.txt", help="file names to check (default: *.txt)")
+    parser.add_argument("--solve", type=float, metavar="SECONDS", default=None,
+                        help="also check solvability, giving up on a card after this many seconds")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--quiet", action="store_true", help="only print cards that are not ok")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    tasks = ((path, args.solve) for path in find_cards(args.directory, args.pattern))
+    counts = Counter()
+    slowest = (0.0, "")
+    with Pool(args.workers or os.cpu_count() or 1) as pool:
+        # Results stream back as each chunk finishes; small chunks keep slow cards from holding up output
+        for path, status, detail, seconds in pool.imap_unordered(validate_file, tasks, chunksize=16):
+            counts[status] += 1
+            slowest = max(slowest, (seconds, path))
+            if not args.quiet or status not in (OK, SOLVABLE):
+                print(f"{status:<10} {path}" + (f": {detail}" if detail else ""), flush=True)
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts.values())
+    summary = ", ".join(f"{status} {counts[status]}" for status in (OK, SOLVABLE, INVALID, UNSOLVABLE, TIMEOUT)
+                        if counts[status])
+    print(f"checked {total} cards in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f} cards/s): {summary or 'none found'}")
+    if slowest[1]:
+        print(f"slowest: {slowest[1]} ({slowest[0] * 1000:.1f} ms)")
+    return 1 if any(counts[status] for status in FAILURES) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
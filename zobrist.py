@@ -0,0 +1,67 @@
+"""64-bit Zobrist keys for board and piece state.
+
+A state's hash is the XOR of one random key per occupied (layer, cell), so placing or removing
+a piece updates it in O(piece cells) and equal states always hash equal. Keys come from
+generators seeded by the table size, so hashes are stable across runs and processes and can
+be stored next to replays or cards.
+
+Set ZOBRIST_DEBUG=1 in the environment to check every incremental update against a full
+recomputation; a mismatch raises AssertionError at the update that broke it.
+"""
+import os
+import random
+from typing import Dict, Iterable, List, Tuple
+
+DEBUG = bool(os.environ.get("ZOBRIST_DEBUG"))
+
+_tables: Dict[Tuple[int, int], List[List[List[int]]]] = {}
+_pieces: Dict[int, List[List[int]]] = {}
+# Piece coordinates may sit a few cells outside the board while it moves
+_MARGIN = 8
+
+
+def cell_keys(width: int, height: int, layers: int = 1) -> List[List[List[int]]]:
+    """Keys indexed [layer][y][x]. Layer l is the same whatever `layers` is asked for."""
+    table = _tables.setdefault((width, height), [])
+    while len(table) < layers:
+        rng = random.Random(f"zobrist:{width}x{height}:{len(table)}")
+        table.append([[rng.getrandbits(64) for _ in range(width)] for _ in range(height)])
+    return table
+
+
+def mask_hash(row_keys: List[int], mask: int) -> int:
+    """XOR of the keys of the set bits of a row bitmask (bit x = column x)."""
+    value = 0
+    while mask:
+        low = mask & -mask
+        value ^= row_keys[low.bit_length() - 1]
+        mask ^= low
+    return value
+
+
+def cells_hash(layer_keys: List[List[int]], cells: Iterable[Tuple[int, int]]) -> int:
+    """XOR of the keys of the given (x, y) cells; cells outside the table are ignored."""
+    value = 0
+    height = len(layer_keys)
+    for cell in cells:
+        x, y = cell[:2]
+        if 0 <= y < height and 0 <= x < len(layer_keys[y]):
+            value ^= layer_keys[y][x]
+    return value
+
+
+def piece_key(shape: int, rotation: int, x: int, y: int) -> int:
+    """Key for a falling piece: which shape, which way round, and where."""
+    table = _pieces.get(shape)
+    if table is None:
+        rng = random.Random(f"zobrist:piece:{shape}")
+        table = _pieces[shape] = [[rng.getrandbits(64) for _ in range(4)],
+                                  [rng.getrandbits(64) for _ in range(256)],
+                                  [rng.getrandbits(64) for _ in range(256)]]
+    rotations, xs, ys = table
+    return rotations[rotation & 3] ^ xs[(x + _MARGIN) & 255] ^ ys[(y + _MARGIN) & 255]
+
+
+def verify(what: str, incremental: int, full: int) -> None:
+    if incremental != full:
+        raise AssertionError(f"{what}: incremental Zobrist hash {incremental:#018x} != recomputed {full:#018x}")